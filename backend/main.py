@@ -5,19 +5,25 @@ FastAPI Backend Server
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, List
 import os
 import sys
 from pathlib import Path
+import logging
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Service modules log through the logging module; show their messages as plain
+# lines like the rest of the startup output (LOG_LEVEL=WARNING quiets them)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+
 # Environment validation
 REQUIRED_ENV_VARS = ["SUPABASE_URL", "SUPABASE_KEY"]
-OPTIONAL_ENV_VARS = ["HOST", "PORT", "DEBUG", "NBA_API_TIMEOUT"]
+OPTIONAL_ENV_VARS = ["HOST", "PORT", "DEBUG", "WORKERS", "NBA_API_TIMEOUT", "LOG_LEVEL"]
 
 def validate_environment():
     """Validate required environment variables are set"""
@@ -45,6 +51,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS configuration
@@ -105,9 +112,15 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
+    reload = os.getenv("DEBUG", "True").lower() == "true"
+    # uvloop/httptools come with uvicorn[standard]; "auto" falls back to
+    # asyncio/h11 where they are unavailable (e.g. Windows).
     uvicorn.run(
         "main:app",
         host=os.getenv("HOST", "0.0.0.0"),
         port=int(os.getenv("PORT", 8000)),
-        reload=os.getenv("DEBUG", "True").lower() == "true"
+        loop="auto",
+        http="auto",
+        workers=1 if reload else int(os.getenv("WORKERS", "1")),
+        reload=reload
     )
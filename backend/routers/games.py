@@ -2,10 +2,16 @@
 Games Router - Handles game logic endpoints
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 import random
+import zlib
+import orjson
+from datetime import date
+from functools import lru_cache
+
+from services.http_cache import cached_response
 
 router = APIRouter()
 
@@ -37,6 +43,11 @@ JOURNEYS = [
     {"teams": ["CHI", "MIN", "PHI", "MIA", "CHI"], "answer": "Jimmy Butler", "player_id": 202710},
 ]
 
+# tuple(teams) -> (journey, lowercased answer); first journey wins on duplicate paths
+JOURNEY_INDEX: Dict[tuple, tuple] = {}
+for _journey in JOURNEYS:
+    JOURNEY_INDEX.setdefault(tuple(_journey["teams"]), (_journey, _journey["answer"].lower()))
+
 # Mock comparison data
 COMPARISONS = [
     {
@@ -49,47 +60,78 @@ COMPARISONS = [
     },
 ]
 
+# Player fields shown in a blind comparison (no names or ids)
+COMPARISON_BLIND_FIELDS = ("pts", "reb", "ast", "fg", "season")
+
+
+def _comparison_winner(comparison: Dict) -> str:
+    """"A" or "B" by overall stats (pts + reb + ast); ties go to B"""
+    a, b = comparison["player_a"], comparison["player_b"]
+    a_score = a["pts"] + a["reb"] + a["ast"]
+    b_score = b["pts"] + b["reb"] + b["ast"]
+    return "A" if a_score > b_score else "B"
+
+
+# comparison_id -> (blind player_a/player_b payload, winner), built once at import
+COMPARISON_TABLE = [
+    (
+        {
+            side: {key: comparison[side][key] for key in COMPARISON_BLIND_FIELDS}
+            for side in ("player_a", "player_b")
+        },
+        _comparison_winner(comparison),
+    )
+    for comparison in COMPARISONS
+]
+
+# Mock players for daily challenge
+DAILY_CHALLENGE_PLAYERS = [
+    {"id": 203507, "name": "Giannis Antetokounmpo", "team": "MIL", "hint": "Greek Freak, 2x MVP"},
+    {"id": 203999, "name": "Nikola Jokic", "team": "DEN", "hint": "Serbian big man, 3x MVP"},
+    {"id": 201566, "name": "Luka Doncic", "team": "DAL", "hint": "Slovenian guard, Triple-double machine"},
+]
+
+# Mock player database lookup for guess checking
+GUESS_PLAYERS = {
+    203507: "Giannis Antetokounmpo",
+    203999: "Nikola Jokic",
+    201566: "Luka Doncic",
+    2544: "LeBron James",
+}
+
+# player_id -> (full name, last name), lowercased once at import
+GUESS_NAMES_LOWER = {
+    pid: (name.lower(), name.lower().split()[-1])
+    for pid, name in GUESS_PLAYERS.items()
+}
+
+
+@lru_cache(maxsize=2)
+def _daily_challenge_body(date_iso: str) -> bytes:
+    """Encoded daily-challenge response; the pick only changes with the date"""
+    player_index = zlib.crc32(date_iso.encode()) % len(DAILY_CHALLENGE_PLAYERS)
+    return orjson.dumps({"challenge": DAILY_CHALLENGE_PLAYERS[player_index], "date": date_iso})
+
 
 @router.get("/daily-challenge")
-async def get_daily_challenge():
+async def get_daily_challenge(request: Request):
     """Get today's daily challenge"""
-    import hashlib
-    from datetime import date
-    
     today = date.today().isoformat()
-    hash_val = int(hashlib.md5(today.encode()).hexdigest(), 16)
-    
-    # Mock player for daily challenge
-    players = [
-        {"id": 203507, "name": "Giannis Antetokounmpo", "team": "MIL", "hint": "Greek Freak, 2x MVP"},
-        {"id": 203999, "name": "Nikola Jokic", "team": "DEN", "hint": "Serbian big man, 3x MVP"},
-        {"id": 201566, "name": "Luka Doncic", "team": "DAL", "hint": "Slovenian guard, Triple-double machine"},
-    ]
-    
-    player_index = hash_val % len(players)
-    return {"challenge": players[player_index], "date": today}
+    return cached_response(request, _daily_challenge_body(today), etag=f'"daily-{today}"', max_age=300)
 
 
 @router.post("/check-guess")
 async def check_guess(player_id: int, guess: str):
     """Check if a guess is correct"""
-    # Mock player database lookup
-    players = {
-        203507: "Giannis Antetokounmpo",
-        203999: "Nikola Jokic",
-        201566: "Luka Doncic",
-        2544: "LeBron James",
-    }
-    
-    correct_name = players.get(player_id, "Unknown")
+    correct_name = GUESS_PLAYERS.get(player_id, "Unknown")
+    name_lower, last_name_lower = GUESS_NAMES_LOWER.get(player_id, ("unknown", "unknown"))
     guess_lower = guess.lower().strip()
-    name_lower = correct_name.lower()
     
     # Check if guess matches (partial match for last name)
     is_correct = (
         guess_lower == name_lower or
         guess_lower in name_lower or
-        name_lower.split()[-1].lower() in guess_lower
+        last_name_lower in guess_lower
     )
     
     return GuessResult(
@@ -113,42 +155,28 @@ async def get_random_journey():
 @router.post("/journey/check")
 async def check_journey(teams: List[str], guess: str):
     """Check if a journey guess is correct"""
-    for journey in JOURNEYS:
-        if journey["teams"] == teams:
-            is_correct = guess.lower() in journey["answer"].lower()
-            return {
-                "correct": is_correct,
-                "answer": journey["answer"],
-                "player_id": journey["player_id"],
-                "points_earned": 100 if is_correct else 0
-            }
+    entry = JOURNEY_INDEX.get(tuple(teams))
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Journey not found")
     
-    raise HTTPException(status_code=404, detail="Journey not found")
+    journey, answer_lower = entry
+    is_correct = guess.lower() in answer_lower
+    return {
+        "correct": is_correct,
+        "answer": journey["answer"],
+        "player_id": journey["player_id"],
+        "points_earned": 100 if is_correct else 0
+    }
 
 
 @router.get("/comparison/random")
 async def get_random_comparison():
     """Get a random stat comparison"""
-    comparison = random.choice(COMPARISONS)
+    comparison_id = random.randrange(len(COMPARISONS))
+    blind, _ = COMPARISON_TABLE[comparison_id]
     
     # Return stats without names for blind comparison
-    return {
-        "player_a": {
-            "pts": comparison["player_a"]["pts"],
-            "reb": comparison["player_a"]["reb"],
-            "ast": comparison["player_a"]["ast"],
-            "fg": comparison["player_a"]["fg"],
-            "season": comparison["player_a"]["season"],
-        },
-        "player_b": {
-            "pts": comparison["player_b"]["pts"],
-            "reb": comparison["player_b"]["reb"],
-            "ast": comparison["player_b"]["ast"],
-            "fg": comparison["player_b"]["fg"],
-            "season": comparison["player_b"]["season"],
-        },
-        "comparison_id": COMPARISONS.index(comparison)
-    }
+    return {**blind, "comparison_id": comparison_id}
 
 
 @router.post("/comparison/reveal")
@@ -158,12 +186,7 @@ async def reveal_comparison(comparison_id: int, choice: str):
         raise HTTPException(status_code=404, detail="Comparison not found")
     
     comparison = COMPARISONS[comparison_id]
-    
-    # Calculate "winner" based on overall stats
-    a_score = comparison["player_a"]["pts"] + comparison["player_a"]["reb"] + comparison["player_a"]["ast"]
-    b_score = comparison["player_b"]["pts"] + comparison["player_b"]["reb"] + comparison["player_b"]["ast"]
-    
-    winner = "A" if a_score > b_score else "B"
+    _, winner = COMPARISON_TABLE[comparison_id]
     user_correct = choice.upper() == winner
     
     return {
@@ -175,19 +198,23 @@ async def reveal_comparison(comparison_id: int, choice: str):
     }
 
 
+# Player fields that add up to a team's battle score
+BATTLE_SCORE_KEYS = ("rating", "pts", "reb", "ast")
+
+
+def calculate_team_score(team: Dict) -> float:
+    """Sum the battle score fields across every player in a team"""
+    return sum(
+        player.get(key, 0)
+        for player in team.values()
+        if isinstance(player, dict)
+        for key in BATTLE_SCORE_KEYS
+    )
+
+
 @router.post("/battle/calculate")
 async def calculate_battle(user_team: Dict, opponent_team: Dict):
     """Calculate battle result between two teams"""
-    def calculate_team_score(team: Dict) -> float:
-        total = 0
-        for player in team.values():
-            if isinstance(player, dict):
-                total += player.get("rating", 0)
-                total += player.get("pts", 0)
-                total += player.get("reb", 0)
-                total += player.get("ast", 0)
-        return total
-    
     user_score = calculate_team_score(user_team)
     opponent_score = calculate_team_score(opponent_team)
     
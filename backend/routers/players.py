@@ -3,12 +3,19 @@ Players Router - Handles player data endpoints with LIVE NBA API data
 Uses LeagueDashPlayerStats for all 450+ active players
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Optional, List
-import random
-import hashlib
+from typing import Callable, Optional, List, Tuple
+from collections import OrderedDict
+import zlib
+import numpy as np
+import orjson
 from datetime import date
+from functools import lru_cache
+import heapq
+from operator import itemgetter
 
 # Import our NBA service
 import sys
@@ -17,6 +24,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from services.nba_service import (
     get_all_players,
+    fetch_all_players_live,
+    get_journey_players,
+    get_player_by_id,
+    get_players_filtered,
     get_players_by_team as service_get_by_team,
     get_players_by_position as service_get_by_position,
     get_top_players,
@@ -26,9 +37,41 @@ from services.nba_service import (
     NBA_TEAMS,
     CURRENT_SEASON,
 )
+from services.http_cache import cached_response, etag_for
 
 router = APIRouter()
 
+_RNG = np.random.default_rng()
+
+# NBA_TEAMS is static, so the /teams body is encoded once at import
+_TEAMS_JSON = orjson.dumps({"teams": NBA_TEAMS, "count": len(NBA_TEAMS)})
+_TEAMS_ETAG = f'"{etag_for(_TEAMS_JSON)}"'
+
+# Encoded bodies + ETags of responses derived only from the player list, keyed
+# by endpoint and parameters; each is tagged with the list it was built from
+# and rebuilt once get_all_players() returns a new one. Only touched from the
+# event loop.
+PLAYER_RESPONSE_CACHE_SIZE = 64
+_player_responses: "OrderedDict[tuple, Tuple[List[dict], bytes, str]]" = OrderedDict()
+
+
+def _player_list_response(request: Request, key: tuple, build: Callable[[], bytes], max_age: int = 3600):
+    """
+    cached_response for a body that only changes when the players memo
+    refreshes: it is encoded and hashed once per refresh, so repeat requests
+    (and 304s) skip the serialization.
+    """
+    all_players = get_all_players()
+    entry = _player_responses.get(key)
+    if entry is None or entry[0] is not all_players:
+        body = build()
+        entry = (all_players, body, f'"{etag_for(body)}"')
+        _player_responses[key] = entry
+        if len(_player_responses) > PLAYER_RESPONSE_CACHE_SIZE:
+            _player_responses.popitem(last=False)
+    _player_responses.move_to_end(key)
+    return cached_response(request, entry[1], etag=entry[2], max_age=max_age)
+
 
 class Player(BaseModel):
     id: int
@@ -53,7 +96,7 @@ class PlayerList(BaseModel):
     season: str
 
 
-@router.get("/", response_model=PlayerList)
+@router.get("/", responses={200: {"model": PlayerList}})
 async def get_players(
     team: Optional[str] = Query(None, description="Filter by team abbreviation"),
     position: Optional[str] = Query(None, description="Filter by position"),
@@ -65,32 +108,22 @@ async def get_players(
     Get list of all NBA players for 2025-26 season with optional filters.
     First call fetches ~450 players from NBA API, subsequent calls use cache.
     """
-    from services.nba_service import get_all_players as fetch_players
+    players = get_players_filtered(team, position, min_ppg, limit, force_refresh=refresh)
     
-    players = fetch_players(force_refresh=refresh)
-    
-    if team:
-        players = [p for p in players if p["team"] == team.upper()]
-    if position:
-        players = [p for p in players if p["position"] == position.upper()]
-    if min_ppg:
-        players = [p for p in players if p["pts"] >= min_ppg]
-    
-    players = players[:limit]
-    
-    return {
+    # Returning the response directly skips jsonable_encoder and response_model
+    # validation for what can be a 500-item list.
+    return ORJSONResponse({
         "players": players,
         "count": len(players),
         "season": CURRENT_SEASON
-    }
+    })
 
 
 @router.get("/refresh")
 async def refresh_players():
     """Force refresh player data from NBA API"""
-    from services.nba_service import fetch_all_players_live
-    
-    players = fetch_all_players_live()
+    # Rate-limited NBA API calls; keep them off the event loop
+    players = await run_in_threadpool(fetch_all_players_live, True)
     return {
         "message": f"Refreshed {len(players)} players from NBA API",
         "count": len(players),
@@ -99,28 +132,32 @@ async def refresh_players():
 
 
 @router.get("/stars")
-async def get_star_players(min_ppg: float = Query(20.0, description="Minimum PPG to be a star")):
+async def get_star_players(request: Request, min_ppg: float = Query(20.0, description="Minimum PPG to be a star")):
     """Get star players (20+ PPG by default)"""
-    stars = get_stars(min_ppg)
-    return {
-        "players": stars,
-        "count": len(stars),
-        "season": CURRENT_SEASON,
-        "criteria": f"{min_ppg}+ PPG"
-    }
+    def build() -> bytes:
+        stars = get_stars(min_ppg)
+        return orjson.dumps({
+            "players": stars,
+            "count": len(stars),
+            "season": CURRENT_SEASON,
+            "criteria": f"{min_ppg}+ PPG"
+        })
+    return _player_list_response(request, ("stars", min_ppg), build)
 
 
 @router.get("/top/{count}")
-async def get_top_n_players(count: int = 50):
+async def get_top_n_players(request: Request, count: int = 50):
     """Get top N players by rating"""
     if count > 100:
         count = 100
-    top = get_top_players(count)
-    return {
-        "players": top,
-        "count": len(top),
-        "season": CURRENT_SEASON
-    }
+    def build() -> bytes:
+        top = get_top_players(count)
+        return orjson.dumps({
+            "players": top,
+            "count": len(top),
+            "season": CURRENT_SEASON
+        })
+    return _player_list_response(request, ("top", count), build)
 
 
 @router.get("/random")
@@ -131,7 +168,8 @@ async def get_random_players(count: int = Query(1, le=10)):
         raise HTTPException(status_code=503, detail="No player data available")
     
     sample_size = min(count, len(all_players))
-    players = random.sample(all_players, sample_size)
+    indices = _RNG.choice(len(all_players), size=sample_size, replace=False)
+    players = [all_players[i] for i in indices]
     return {"players": players, "season": CURRENT_SEASON}
 
 
@@ -147,33 +185,40 @@ async def get_role_players(count: int = Query(30, le=50)):
     }
 
 
+@lru_cache(maxsize=8)
+def _daily_index(date_iso: str, n_choices: int) -> int:
+    """Deterministic index for a date's daily pick among n_choices"""
+    return zlib.crc32(date_iso.encode()) % n_choices
+
+
 @router.get("/daily")
-async def get_daily_player():
+async def get_daily_player(request: Request):
     """Get today's daily challenge player (deterministic based on date)"""
     all_players = get_all_players()
     if not all_players:
         raise HTTPException(status_code=503, detail="No player data available")
     
-    # Use stars for daily challenge (more recognizable)
-    stars = [p for p in all_players if p["pts"] >= 15 and p["gp"] >= 20]
-    if not stars:
-        stars = all_players[:50]
-    
     today = date.today().isoformat()
-    hash_val = int(hashlib.md5(today.encode()).hexdigest(), 16)
-    player_index = hash_val % len(stars)
     
-    return {
-        "player": stars[player_index],
-        "date": today,
-        "season": CURRENT_SEASON
-    }
+    def build() -> bytes:
+        # Use stars for daily challenge (more recognizable)
+        stars = get_stars(15.0, min_gp=20)
+        if not stars:
+            stars = all_players[:50]
+        
+        player_index = _daily_index(today, len(stars))
+        return orjson.dumps({
+            "player": stars[player_index],
+            "date": today,
+            "season": CURRENT_SEASON
+        })
+    return _player_list_response(request, ("daily", today), build, max_age=300)
 
 
 @router.get("/teams")
-async def get_all_teams():
+async def get_all_teams(request: Request):
     """Get all NBA teams"""
-    return {"teams": NBA_TEAMS, "count": len(NBA_TEAMS)}
+    return cached_response(request, _TEAMS_JSON, etag=_TEAMS_ETAG, max_age=86400)
 
 
 @router.get("/team/{team_abbr}")
@@ -223,16 +268,19 @@ async def get_players_by_position(
     
     # For draft mode, get random selection of varied skill levels
     if for_draft and len(players) > limit:
-        # Mix of stars, good players, and role players
-        sorted_players = sorted(players, key=lambda x: x["pts"], reverse=True)
+        # Mix of stars, good players, and role players (only the top 30 by PPG
+        # are ever picked, so there's no need to sort the rest)
+        sorted_players = heapq.nlargest(30, players, key=itemgetter("pts"))
         top_tier = sorted_players[:10]
-        mid_tier = sorted_players[10:30] if len(sorted_players) > 30 else sorted_players[10:]
+        mid_tier = sorted_players[10:]
         
         selection = []
         if top_tier:
-            selection.extend(random.sample(top_tier, min(2, len(top_tier))))
+            picks = _RNG.choice(len(top_tier), size=min(2, len(top_tier)), replace=False)
+            selection.extend(top_tier[i] for i in picks)
         if mid_tier:
-            selection.extend(random.sample(mid_tier, min(limit - len(selection), len(mid_tier))))
+            picks = _RNG.choice(len(mid_tier), size=min(limit - len(selection), len(mid_tier)), replace=False)
+            selection.extend(mid_tier[i] for i in picks)
         
         players = selection
     else:
@@ -255,9 +303,7 @@ async def get_journey_game_players(
     Get players with their complete team history for The Journey game.
     Returns players who have played for multiple teams.
     """
-    from services.nba_service import get_journey_players
-    
-    players = get_journey_players(count, min_teams)
+    players = await run_in_threadpool(get_journey_players, count, min_teams)
     
     return {
         "players": players,
@@ -269,8 +315,7 @@ async def get_journey_game_players(
 @router.get("/{player_id}")
 async def get_player(player_id: int):
     """Get a specific player by ID"""
-    all_players = get_all_players()
-    player = next((p for p in all_players if p["id"] == player_id), None)
+    player = get_player_by_id(player_id)
     
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
@@ -5,26 +5,49 @@ Data flow: Supabase cached_shot_charts (primary) -> NBA API (fetch + save) -> em
 Never generates simulated or fake data.
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
 import io
+import multiprocessing
 import os
+import queue
+import threading
+import time
+import orjson
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
+
 # Try to import visualization libraries
 try:
     import matplotlib
     matplotlib.use('Agg')  # Non-interactive backend
     import matplotlib.pyplot as plt
-    import numpy as np
-    from scipy import stats as scipy_stats
+    from matplotlib.figure import Figure
+    from matplotlib.collections import LineCollection
+    from matplotlib.colors import LinearSegmentedColormap, to_rgba
+    from scipy.ndimage import gaussian_filter
     HAS_VISUALIZATION = True
 except ImportError:
     HAS_VISUALIZATION = False
 
+try:
+    from nba_api.stats.endpoints import ShotChartDetail
+    HAS_NBA_API = True
+except ImportError:
+    HAS_NBA_API = False
+
 from services.nba_service import get_supabase_client
+from services.nba_http import fetch_nba_endpoint
+from services.http_cache import cache_headers, cached_response, is_not_modified
+from services.shot_zones import HAS_NUMBA, ZONE_ORDER, classify_zone_indices
 
 router = APIRouter()
 
@@ -99,20 +122,40 @@ STAT_GLOSSARY = [
 ]
 
 
+def _encode_glossary(stats: list) -> bytes:
+    return orjson.dumps({"stats": stats, "count": len(stats)})
+
+
+# The glossary is static, so it is grouped by lowercased category and every
+# response body is encoded once at import.
+_GLOSSARY_BY_CATEGORY: Dict[str, list] = {}
+for _stat in STAT_GLOSSARY:
+    _GLOSSARY_BY_CATEGORY.setdefault(_stat["category"].lower(), []).append(_stat)
+del _stat
+
+_GLOSSARY_JSON = _encode_glossary(STAT_GLOSSARY)
+_GLOSSARY_JSON_BY_CATEGORY = {
+    cat: _encode_glossary(stats) for cat, stats in _GLOSSARY_BY_CATEGORY.items()
+}
+_GLOSSARY_EMPTY_JSON = _encode_glossary([])
+_GLOSSARY_JSON_BY_ABBR = {s["abbr"].lower(): orjson.dumps(s) for s in STAT_GLOSSARY}
+
+
 @router.get("/glossary")
-async def get_stat_glossary(category: Optional[str] = None):
-    stats = STAT_GLOSSARY
+async def get_stat_glossary(request: Request, category: Optional[str] = None):
     if category:
-        stats = [s for s in stats if s["category"].lower() == category.lower()]
-    return {"stats": stats, "count": len(stats)}
+        body = _GLOSSARY_JSON_BY_CATEGORY.get(category.lower(), _GLOSSARY_EMPTY_JSON)
+    else:
+        body = _GLOSSARY_JSON
+    return cached_response(request, body, max_age=86400)
 
 
 @router.get("/glossary/{abbr}")
-async def get_stat_definition(abbr: str):
-    stat = next((s for s in STAT_GLOSSARY if s["abbr"].lower() == abbr.lower()), None)
-    if not stat:
+async def get_stat_definition(request: Request, abbr: str):
+    body = _GLOSSARY_JSON_BY_ABBR.get(abbr.lower())
+    if body is None:
         raise HTTPException(status_code=404, detail="Stat not found")
-    return stat
+    return cached_response(request, body, max_age=86400)
 
 
 # ---------------------------------------------------------------------------
@@ -188,7 +231,7 @@ def _get_cached_shots(player_id: int, season: str):
 
 def _save_shot_data(player_id: int, season: str, shots: list, zones: list,
                     distribution: list, total_shots: int, fg_pct: float,
-                    three_pct: float, paint_pct: float):
+                    three_pct: float, paint_pct: float, cached_at: str):
     """Upsert shot chart data to Supabase cached_shot_charts."""
     client = get_supabase_client()
     if not client:
@@ -204,7 +247,7 @@ def _save_shot_data(player_id: int, season: str, shots: list, zones: list,
             "fg_pct": fg_pct,
             "three_pct": three_pct,
             "paint_pct": paint_pct,
-            "cached_at": datetime.now(timezone.utc).isoformat(),
+            "cached_at": cached_at,
         }, on_conflict="player_id,season").execute()
         print(f"Saved shot chart for player {player_id} ({season}) to Supabase")
     except Exception as e:
@@ -225,6 +268,18 @@ def _is_shot_cache_fresh(row: dict) -> bool:
         return False
 
 
+# In-process cache in front of Supabase / NBA API, keyed by (player_id, season).
+# Rows are shared between requests and must be treated as read-only; each
+# carries its column "arrays" and precomputed "summary" (_with_shot_summary)
+# instead of the stored per-shot dict list.
+# Misses are remembered briefly so players without data don't re-hit the NBA API.
+SHOT_MEMORY_TTL_SECONDS = 3600
+SHOT_MEMORY_MISS_TTL_SECONDS = 600
+SHOT_MEMORY_CACHE_SIZE = 512
+_shot_memory_cache: "OrderedDict[Tuple[int, str], Tuple[float, Optional[dict]]]" = OrderedDict()
+_shot_memory_lock = threading.Lock()
+
+
 # ---------------------------------------------------------------------------
 # Shot classification helpers
 # ---------------------------------------------------------------------------
@@ -260,78 +315,109 @@ def classify_shot_zone(x: float, y: float, distance: float) -> str:
         return 'mid_center'
 
 
-def _compute_zones_from_shots(shots: list):
-    """Derive hex zone data and distribution data from a raw shots list."""
-    hex_raw: Dict[str, Dict] = {k: {'made': 0, 'attempts': 0} for k in LEAGUE_AVG_BY_ZONE}
-    dist_raw = {
-        'restricted_area': {'made': 0, 'attempts': 0, 'name': 'Restricted Area'},
-        'paint':           {'made': 0, 'attempts': 0, 'name': 'Paint (Non-RA)'},
-        'mid_range':       {'made': 0, 'attempts': 0, 'name': 'Mid-Range'},
-        'corner_3':        {'made': 0, 'attempts': 0, 'name': 'Corner 3'},
-        'above_break_3':   {'made': 0, 'attempts': 0, 'name': 'Above Break 3'},
-    }
-    total = len(shots)
-    total_made = 0
-    three_attempts = 0
-    three_made = 0
-    paint_attempts = 0
-    paint_made = 0
-
-    for s in shots:
-        x, y, made = float(s['x']), float(s['y']), bool(s['made'])
-        dist = (x**2 + y**2) ** 0.5
-        if made:
-            total_made += 1
-
-        zk = classify_shot_zone(x, y, dist)
-        if zk in hex_raw:
-            hex_raw[zk]['attempts'] += 1
-            if made:
-                hex_raw[zk]['made'] += 1
-
-        is_three = dist > 237.5 or (abs(x) >= 220 and y <= 90)
-        if y <= 50 and dist <= 40:
-            dk = 'restricted_area'
-        elif y <= 190 and abs(x) <= 80:
-            dk = 'paint'
-        elif is_three:
-            dk = 'corner_3' if (abs(x) >= 220 and y <= 90) else 'above_break_3'
-        else:
-            dk = 'mid_range'
-        dist_raw[dk]['attempts'] += 1
-        if made:
-            dist_raw[dk]['made'] += 1
-
-        if is_three:
-            three_attempts += 1
-            if made:
-                three_made += 1
-        if dist <= 80:
-            paint_attempts += 1
-            if made:
-                paint_made += 1
+ZONE_KEYS = tuple(LEAGUE_AVG_BY_ZONE)
+_ZONE_CODE = {zk: i for i, zk in enumerate(ZONE_KEYS)}
+
+DIST_ZONES = (
+    ('restricted_area', 'Restricted Area'),
+    ('paint', 'Paint (Non-RA)'),
+    ('mid_range', 'Mid-Range'),
+    ('corner_3', 'Corner 3'),
+    ('above_break_3', 'Above Break 3'),
+)
+
+
+# ZONE_ORDER index (shot_zones kernel) -> ZONE_KEYS index
+_ZONE_ORDER_TO_CODE = np.array([_ZONE_CODE[zk] for zk in ZONE_ORDER], dtype=np.intp)
+
+
+def classify_shot_zones(x: "np.ndarray", y: "np.ndarray", dist: "np.ndarray") -> "np.ndarray":
+    """Vectorized classify_shot_zone: index into ZONE_KEYS for every shot."""
+    if HAS_NUMBA:
+        return _ZONE_ORDER_TO_CODE[classify_zone_indices(x, y, dist)]
+    ax = np.abs(x)
+    left = x < 0
+    ra = (y <= 50) & (dist <= 40)
+    paint = (y <= 190) & (ax <= 80)
+    three = (dist > 237.5) | ((ax >= 220) & (y <= 90))
+    corner = three & (y <= 90)
+    wing = three & (ax > 130)
+    slot = three & (ax > 50)
+    baseline = y <= 100
+    # Same precedence as classify_shot_zone: np.select takes the first match.
+    conditions = [
+        ra, paint & (x < -25), paint & (x > 25), paint,
+        corner & left, corner, wing & left, wing, slot & left, slot, three,
+        baseline & left, baseline, (ax > 100) & left, ax > 100, (ax > 40) & left, ax > 40,
+    ]
+    choices = [_ZONE_CODE[zk] for zk in (
+        'restricted_area', 'paint_left', 'paint_right', 'paint_center',
+        'corner_3_left', 'corner_3_right', 'above_break_3_left', 'above_break_3_right',
+        'above_break_3_center_left', 'above_break_3_center_right', 'above_break_3_center',
+        'mid_left_baseline', 'mid_right_baseline', 'mid_left', 'mid_right',
+        'mid_center_left', 'mid_center_right',
+    )]
+    return np.select(conditions, choices, default=_ZONE_CODE['mid_center'])
+
+
+def _shot_arrays(shots: list):
+    """Column arrays (x, y, made) for a list of shot dicts."""
+    n = len(shots)
+    x = np.fromiter((s['x'] for s in shots), dtype=np.float64, count=n)
+    y = np.fromiter((s['y'] for s in shots), dtype=np.float64, count=n)
+    made = np.fromiter((bool(s['made']) for s in shots), dtype=bool, count=n)
+    return x, y, made
+
+
+def _compute_shot_summary(x: "np.ndarray", y: "np.ndarray", made: "np.ndarray") -> dict:
+    """
+    Every aggregate the shot endpoints serve, in one vectorized pass: hex
+    zones, five-zone distribution, headline percentages, three-point counts
+    and the per-shot is_three flags.
+    """
+    total = len(x)
+    dist = np.hypot(x, y)
+
+    zone_ids = classify_shot_zones(x, y, dist)
+    hex_attempts = np.bincount(zone_ids, minlength=len(ZONE_KEYS))
+    hex_made = np.bincount(zone_ids[made], minlength=len(ZONE_KEYS))
+
+    ra = (y <= 50) & (dist <= 40)
+    paint = (y <= 190) & (np.abs(x) <= 80)
+    corner = (np.abs(x) >= 220) & (y <= 90)
+    is_three = (dist > 237.5) | corner
+    dist_ids = np.select([ra, paint, is_three & corner, is_three], [0, 1, 3, 4], default=2)
+    dist_attempts = np.bincount(dist_ids, minlength=len(DIST_ZONES))
+    dist_made = np.bincount(dist_ids[made], minlength=len(DIST_ZONES))
+
+    total_made = int(made.sum())
+    three_attempts = int(is_three.sum())
+    three_made = int((is_three & made).sum())
+    near = dist <= 80
+    paint_attempts = int(near.sum())
+    paint_made = int((near & made).sum())
 
     hex_zones = []
-    for zk, data in hex_raw.items():
-        if data['attempts'] > 0:
-            freq = data['attempts'] / total if total > 0 else 0
+    for i, zk in enumerate(ZONE_KEYS):
+        attempts, zone_made = int(hex_attempts[i]), int(hex_made[i])
+        if attempts > 0:
+            freq = attempts / total if total > 0 else 0
             size = 'high' if freq > 0.10 else ('med' if freq > 0.04 else 'low')
             hex_zones.append({
                 'zone': ZONE_NAMES.get(zk, zk),
                 'zone_key': zk,
-                'made': data['made'],
-                'attempts': data['attempts'],
-                'pct': round((data['made'] / data['attempts']) * 100, 1),
+                'made': zone_made,
+                'attempts': attempts,
+                'pct': round((zone_made / attempts) * 100, 1),
                 'league_avg': LEAGUE_AVG_BY_ZONE.get(zk, 40.0),
                 'size': size,
             })
 
     distribution = []
-    for data in dist_raw.values():
-        att = data['attempts']
-        md = data['made']
+    for i, (_, name) in enumerate(DIST_ZONES):
+        att, md = int(dist_attempts[i]), int(dist_made[i])
         distribution.append({
-            'zone': data['name'],
+            'zone': name,
             'pct': round((att / total * 100), 1) if total > 0 else 0,
             'efficiency': round((md / att * 100), 1) if att > 0 else 0,
             'made': md,
@@ -342,19 +428,76 @@ def _compute_zones_from_shots(shots: list):
     three_pct = round((three_made / three_attempts) * 100, 1) if three_attempts > 0 else 0
     paint_pct = round((paint_made / paint_attempts) * 100, 1) if paint_attempts > 0 else 0
 
-    return hex_zones, distribution, total, fg_pct, three_pct, paint_pct
+    return {
+        'zones': hex_zones,
+        'distribution': distribution,
+        'total_shots': total,
+        'made': total_made,
+        'fg_pct': fg_pct,
+        'three_attempts': three_attempts,
+        'three_made': three_made,
+        'three_pct': three_pct,
+        'paint_pct': paint_pct,
+        'is_three': is_three,
+    }
 
 
 # ---------------------------------------------------------------------------
 # Core fetch: DB first, NBA API fallback, save to DB
 # ---------------------------------------------------------------------------
 
+def _shot_arrays_from_response(shot_data):
+    """
+    Pull LOC_X, LOC_Y and SHOT_MADE_FLAG straight out of the raw resultSets JSON
+    as NumPy arrays, skipping the full pandas DataFrame nba_api would build.
+    """
+    result = shot_data.nba_response.get_dict()['resultSets'][0]
+    headers, rows = result['headers'], result['rowSet']
+    hx, hy, hm = (headers.index(col) for col in ('LOC_X', 'LOC_Y', 'SHOT_MADE_FLAG'))
+    n = len(rows)
+    xs = np.fromiter((r[hx] for r in rows), dtype=np.float64, count=n)
+    ys = np.fromiter((r[hy] for r in rows), dtype=np.float64, count=n)
+    made = np.fromiter((r[hm] == 1 for r in rows), dtype=bool, count=n)
+    return xs, ys, made
+
+
 def _fetch_and_cache_shot_data(player_id: int, season: str, force_refresh: bool = False):
     """
-    Return shot data row. Checks Supabase first; if missing fetches from
-    NBA API, saves to Supabase, and returns. Returns None if no data exists.
-    Never generates simulated data.
+    Return shot data row. Checks the in-process cache, then Supabase; if
+    missing fetches from NBA API, saves to Supabase, and returns. Returns None
+    if no data exists. Never generates simulated data.
+    """
+    key = (player_id, season)
+    if not force_refresh:
+        with _shot_memory_lock:
+            entry = _shot_memory_cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+    row = _load_shot_data(player_id, season, force_refresh)
+    if row and "summary" not in row:
+        row = _with_shot_summary(row)
+    ttl = SHOT_MEMORY_TTL_SECONDS if row else SHOT_MEMORY_MISS_TTL_SECONDS
+    with _shot_memory_lock:
+        _shot_memory_cache[key] = (time.monotonic() + ttl, row)
+        _shot_memory_cache.move_to_end(key)
+        if len(_shot_memory_cache) > SHOT_MEMORY_CACHE_SIZE:
+            _shot_memory_cache.popitem(last=False)
+    return row
+
+
+def _with_shot_summary(row: dict) -> dict:
+    """
+    Copy of a stored row with its column arrays and _compute_shot_summary
+    attached in place of the per-shot dict list.
     """
+    x, y, made = _shot_arrays(row.get("shots") or [])
+    columnar = {k: v for k, v in row.items() if k != "shots"}
+    return {**columnar, "arrays": (x, y, made), "summary": _compute_shot_summary(x, y, made)}
+
+
+def _load_shot_data(player_id: int, season: str, force_refresh: bool = False):
+    """Supabase-first shot data load with NBA API fallback (see _fetch_and_cache_shot_data)."""
     row = _get_cached_shots(player_id, season)
     if row and not force_refresh and _is_shot_cache_fresh(row):
         print(f"Cache hit: shot chart for player {player_id} ({season})")
@@ -364,31 +507,35 @@ def _fetch_and_cache_shot_data(player_id: int, season: str, force_refresh: bool
     elif row:
         print(f"Cache stale: refreshing shot chart for player {player_id} ({season})")
 
+    if not HAS_NBA_API:
+        # Nothing to refresh from, so a stale row is still the best answer
+        return row
+
     print(f"Fetching shot chart from NBA API for player {player_id} ({season})...")
     shots = []
+    summary = None
     try:
-        from nba_api.stats.endpoints import shotchartdetail
-        import time
-        time.sleep(0.6)
-        shot_data = shotchartdetail.ShotChartDetail(
+        shot_data = fetch_nba_endpoint(
+            ShotChartDetail,
             team_id=0,
             player_id=player_id,
             season_nullable=season,
             season_type_all_star='Regular Season',
             context_measure_simple='FGA',
             timeout=20,
+            force_refresh=force_refresh,
         )
-        df = shot_data.get_data_frames()[0]
-        if len(df) > 0:
-            for _, s in df.iterrows():
-                fx, fy = float(s['LOC_X']), float(s['LOC_Y'])
-                dist = (fx**2 + fy**2) ** 0.5
-                shots.append({
-                    'x': round(fx, 1),
-                    'y': round(fy, 1),
-                    'made': bool(s['SHOT_MADE_FLAG'] == 1),
-                    'is_three': bool(dist > 237.5 or (abs(fx) >= 220 and fy <= 90)),
-                })
+        xs, ys, made = _shot_arrays_from_response(shot_data)
+        if len(xs) > 0:
+            # Stored coordinates are rounded to 0.1; summarize the same values
+            xs, ys = np.round(xs, 1), np.round(ys, 1)
+            summary = _compute_shot_summary(xs, ys, made)
+            shots = [
+                {'x': fx, 'y': fy, 'made': m, 'is_three': t}
+                for fx, fy, m, t in zip(
+                    xs.tolist(), ys.tolist(), made.tolist(), summary['is_three'].tolist(),
+                )
+            ]
             print(f"Fetched {len(shots)} shots for player {player_id}")
     except Exception as e:
         print(f"NBA API unavailable for shot chart ({player_id}): {e}")
@@ -396,30 +543,34 @@ def _fetch_and_cache_shot_data(player_id: int, season: str, force_refresh: bool
     if not shots:
         return None
 
-    hex_zones, distribution, total_shots, fg_pct, three_pct, paint_pct = _compute_zones_from_shots(shots)
+    cached_at = datetime.now(timezone.utc).isoformat()
 
     _save_shot_data(
         player_id=player_id,
         season=season,
         shots=shots,
-        zones=hex_zones,
-        distribution=distribution,
-        total_shots=total_shots,
-        fg_pct=fg_pct,
-        three_pct=three_pct,
-        paint_pct=paint_pct,
+        zones=summary["zones"],
+        distribution=summary["distribution"],
+        total_shots=summary["total_shots"],
+        fg_pct=summary["fg_pct"],
+        three_pct=summary["three_pct"],
+        paint_pct=summary["paint_pct"],
+        cached_at=cached_at,
     )
 
+    # The shot dicts only exist for the Supabase upsert; the cached row keeps columns.
     return {
         "player_id": player_id,
         "season": season,
-        "shots": shots,
-        "zones": hex_zones,
-        "distribution": distribution,
-        "total_shots": total_shots,
-        "fg_pct": fg_pct,
-        "three_pct": three_pct,
-        "paint_pct": paint_pct,
+        "zones": summary["zones"],
+        "distribution": summary["distribution"],
+        "total_shots": summary["total_shots"],
+        "fg_pct": summary["fg_pct"],
+        "three_pct": summary["three_pct"],
+        "paint_pct": summary["paint_pct"],
+        "cached_at": cached_at,
+        "arrays": (xs, ys, made),
+        "summary": summary,
     }
 
 
@@ -458,10 +609,12 @@ def _fetch_shot_data_with_fallback(player_id: int, season: str, force_refresh: b
             season_label,
             force_refresh=force_refresh if idx == 0 else False,
         )
-        if row and row.get("shots"):
-            row["season_used"] = season_label
-            row["season_fallback_used"] = season_label != season
-            return row
+        if row and row["summary"]["total_shots"]:
+            return {
+                **row,
+                "season_used": season_label,
+                "season_fallback_used": season_label != season,
+            }
 
     return None
 
@@ -470,45 +623,70 @@ def _fetch_shot_data_with_fallback(player_id: int, season: str, force_refresh: b
 # Endpoints
 # ---------------------------------------------------------------------------
 
-@router.get("/shot-chart/{player_id}")
+class ShotColumns(BaseModel):
+    """Shot chart dots in columnar form; index i across all lists is one shot."""
+    x: List[float]
+    y: List[float]
+    made: List[bool]
+    is_three: List[bool]
+
+
+class ShotChartResponse(BaseModel):
+    player_id: int
+    season_used: str
+    season_fallback_used: bool
+    using_real_data: bool
+    shots: ShotColumns
+    stats: Dict[str, float]
+
+
+SHOT_COLUMNS = ("x", "y", "made", "is_three")
+
+
+def _shots_to_columns(shots: list) -> Dict[str, list]:
+    """Convert a list of shot dicts into the columnar ShotColumns layout."""
+    return {col: [s[col] for s in shots] for col in SHOT_COLUMNS}
+
+
+def _row_shot_columns(row: dict) -> Dict[str, "np.ndarray"]:
+    """ShotColumns straight from a cached row's arrays; ORJSONResponse serializes them natively."""
+    x, y, made = row["arrays"]
+    return dict(zip(SHOT_COLUMNS, (x, y, made, row["summary"]["is_three"])))
+
+
+@router.get("/shot-chart/{player_id}", responses={200: {"model": ShotChartResponse}})
 async def get_shot_chart(player_id: int, season: str = "2025-26", refresh: bool = False):
-    """Individual shot dots. DB-first, never simulated."""
-    row = _fetch_shot_data_with_fallback(player_id, season, force_refresh=refresh)
+    """
+    Individual shot dots as column arrays (see ShotColumns). DB-first, never simulated.
+    Returned as an ORJSONResponse so the shot arrays skip jsonable_encoder.
+    """
+    row = await run_in_threadpool(_fetch_shot_data_with_fallback, player_id, season, refresh)
     if not row:
-        return {
+        return ORJSONResponse({
             "player_id": player_id,
             "season_used": season,
             "season_fallback_used": False,
             "using_real_data": False,
-            "shots": [],
+            "shots": _shots_to_columns([]),
             "stats": {"total_shots": 0, "made": 0, "fg_pct": 0, "three_attempts": 0, "three_made": 0, "three_pct": 0},
-        }
-    shots = row["shots"]
-    total = len(shots)
-    made = sum(1 for s in shots if s["made"])
-    threes = [s for s in shots if s["is_three"]]
-    threes_made = sum(1 for s in threes if s["made"])
-    return {
+        })
+    summary = row["summary"]
+    return ORJSONResponse({
         "player_id": player_id,
         "season_used": row.get("season_used", season),
         "season_fallback_used": row.get("season_fallback_used", False),
         "using_real_data": True,
-        "shots": shots,
-        "stats": {
-            "total_shots": total,
-            "made": made,
-            "fg_pct": round((made / total) * 100, 1) if total else 0,
-            "three_attempts": len(threes),
-            "three_made": threes_made,
-            "three_pct": round((threes_made / len(threes)) * 100, 1) if threes else 0,
-        },
-    }
+        "shots": _row_shot_columns(row),
+        "stats": {key: summary[key] for key in (
+            "total_shots", "made", "fg_pct", "three_attempts", "three_made", "three_pct",
+        )},
+    })
 
 
 @router.get("/shot-zones/{player_id}")
 async def get_shot_zones(player_id: int, season: str = "2025-26", refresh: bool = False):
     """Hex bin zones. DB-first, never simulated."""
-    row = _fetch_shot_data_with_fallback(player_id, season, force_refresh=refresh)
+    row = await run_in_threadpool(_fetch_shot_data_with_fallback, player_id, season, refresh)
     if not row:
         return {"player_id": player_id, "season_used": season, "season_fallback_used": False, "using_real_data": False, "total_shots": 0, "fg_pct": 0, "three_pct": 0, "paint_pct": 0, "zones": []}
     return {
@@ -516,18 +694,18 @@ async def get_shot_zones(player_id: int, season: str = "2025-26", refresh: bool
         "season_used": row.get("season_used", season),
         "season_fallback_used": row.get("season_fallback_used", False),
         "using_real_data": True,
-        "total_shots": row["total_shots"],
-        "fg_pct": row["fg_pct"],
-        "three_pct": row["three_pct"],
-        "paint_pct": row["paint_pct"],
-        "zones": row["zones"],
+        "total_shots": row["summary"]["total_shots"],
+        "fg_pct": row["summary"]["fg_pct"],
+        "three_pct": row["summary"]["three_pct"],
+        "paint_pct": row["summary"]["paint_pct"],
+        "zones": row["summary"]["zones"],
     }
 
 
 @router.get("/shot-distribution/{player_id}")
 async def get_shot_distribution(player_id: int, season: str = "2025-26", refresh: bool = False):
     """Five-zone shot distribution. DB-first, never simulated."""
-    row = _fetch_shot_data_with_fallback(player_id, season, force_refresh=refresh)
+    row = await run_in_threadpool(_fetch_shot_data_with_fallback, player_id, season, refresh)
     if not row:
         return {"player_id": player_id, "season_used": season, "season_fallback_used": False, "using_real_data": False, "total_shots": 0, "zones": []}
     return {
@@ -535,89 +713,182 @@ async def get_shot_distribution(player_id: int, season: str = "2025-26", refresh
         "season_used": row.get("season_used", season),
         "season_fallback_used": row.get("season_fallback_used", False),
         "using_real_data": True,
-        "total_shots": row["total_shots"],
-        "zones": row["distribution"],
+        "total_shots": row["summary"]["total_shots"],
+        "zones": row["summary"]["distribution"],
     }
 
 
-@router.get("/heatmap/{player_id}")
-async def get_player_heatmap(player_id: int, season: str = "2025-26", refresh: bool = False):
+# ---------------------------------------------------------------------------
+# Heatmap rendering
+# ---------------------------------------------------------------------------
+
+# Rendered PNGs keyed by (player_id, season, cached_at). cached_at changes whenever
+# the underlying shot data is refreshed, so an entry can never outlive its data.
+HEATMAP_CACHE_SIZE = 256
+
+# Density grid over the court window x in [-250, 250], y in [-50, 300] (2-unit cells)
+HEATMAP_EXTENT = ((-250, 250), (-50, 300))
+HEATMAP_GRID_X = 250
+HEATMAP_GRID_Y = 175
+# Blur width as a fraction of the shot spread (per axis), like gaussian_kde's bw_method
+HEATMAP_BANDWIDTH = 0.25
+# Above this many shots a fixed random sample is rendered; the blurred density
+# looks the same and the transfer to the render process stays bounded.
+HEATMAP_MAX_SHOTS = 2000
+_heatmap_png_cache: "OrderedDict[Tuple[int, str, str], bytes]" = OrderedDict()
+_heatmap_cache_lock = threading.Lock()
+# Renders in progress, same key; concurrent misses await one render instead of
+# each starting their own. Only touched from the event loop.
+_heatmap_renders: "Dict[Tuple[int, str, str], asyncio.Future]" = {}
+
+# Heatmap renders run in worker processes (created on first use) so density +
+# Matplotlib work never holds the API process's GIL. Workers are spawned rather
+# than forked: the pool starts inside a running multi-threaded server, and a
+# forked child could inherit a lock another thread was holding.
+HEATMAP_RENDER_WORKERS = int(os.getenv("HEATMAP_RENDER_WORKERS", "2"))
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=HEATMAP_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _render_pool
+
+
+def _discard_render_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken render pool so the next render starts a fresh one."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+COURT_COLOR = '#AAAAAA'
+COURT_LINEWIDTH = 1.5
+
+
+def _build_court_lines() -> dict:
     """
-    Smooth KDE heatmap PNG generated from authenticated shot data in Supabase.
-    Yellow represents highest shot-frequency intensity.
-    Returns 404 if no data is available (run sync script to populate DB).
+    Court outline as LineCollection keyword arguments; identical for every
+    heatmap, so the segments and per-line styles are computed once at import.
     """
-    if not HAS_VISUALIZATION:
-        raise HTTPException(status_code=500, detail="Visualization libraries not installed. Run: pip install matplotlib numpy scipy")
+    pw, ph = 80, 190
+    theta = np.linspace(np.arcsin(90 / 237.5), np.pi - np.arcsin(90 / 237.5), 100)
+    half = np.linspace(0, np.pi, 50)
+    half_back = np.linspace(np.pi, 2 * np.pi, 50)
+    rim = np.linspace(0, 2 * np.pi, 60)
+    lines = [
+        (237.5 * np.cos(theta), 237.5 * np.sin(theta), {}),
+        ([-220, -220], [-47.5, 90], {}),
+        ([220, 220], [-47.5, 90], {}),
+        ([-pw, -pw], [-47.5, ph - 47.5], {}),
+        ([pw, pw], [-47.5, ph - 47.5], {}),
+        ([-pw, pw], [ph - 47.5, ph - 47.5], {}),
+        (60 * np.cos(half), 60 * np.sin(half) + ph - 47.5, {}),
+        (60 * np.cos(half_back), 60 * np.sin(half_back) + ph - 47.5, {"linestyle": "--", "alpha": 0.5}),
+        (40 * np.cos(half), 40 * np.sin(half), {}),
+        ([-30, 30], [-7.5, -7.5], {"linewidth": 3}),
+        (7.5 * np.cos(rim), 7.5 * np.sin(rim), {"linewidth": 2}),
+    ]
+    return {
+        "segments": [np.column_stack((xs, ys)) for xs, ys, _ in lines],
+        "colors": [to_rgba(COURT_COLOR, style.get("alpha", 1.0)) for _, _, style in lines],
+        "linewidths": [style.get("linewidth", COURT_LINEWIDTH) for _, _, style in lines],
+        "linestyles": [style.get("linestyle", "-") for _, _, style in lines],
+    }
 
-    row = _fetch_and_cache_shot_data(player_id, season, force_refresh=refresh)
-    if not row or not row.get("shots"):
-        raise HTTPException(status_code=404, detail="No shot data available for this player. Run the sync script to populate the database.")
 
-    shots = row["shots"]
-    shots_x = np.array([s["x"] for s in shots])
-    shots_y = np.array([s["y"] for s in shots])
+_COURT_LINES = _build_court_lines() if HAS_VISUALIZATION else {}
+_HEATMAP_CMAP = LinearSegmentedColormap.from_list('smooth_heat', [
+    (0.00, '#000000'), (0.12, '#1a0a24'), (0.28, '#4a1076'),
+    (0.45, '#8b1a6b'), (0.62, '#c92e4a'), (0.78, '#e85a2c'),
+    (0.90, '#f99c1c'), (1.00, '#fcec38'),
+]) if HAS_VISUALIZATION else None
+
+# Heatmap figures are reused rather than rebuilt per render. They are plain
+# Figure objects (not pyplot-managed), so each render clears and redraws the
+# axes; the pool grows to the number of concurrent renders.
+_heatmap_figure_pool: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+
+
+def _acquire_heatmap_figure() -> tuple:
+    """Take a (fig, ax, cax) triple from the pool, building one if it is empty."""
+    try:
+        return _heatmap_figure_pool.get_nowait()
+    except queue.Empty:
+        fig = Figure(figsize=(8, 7.3), facecolor='#000000')
+        gs = fig.add_gridspec(2, 1, height_ratios=[10, 1], hspace=0.05)
+        return fig, fig.add_subplot(gs[0]), fig.add_subplot(gs[1])
+
 
-    fig = plt.figure(figsize=(12, 11), facecolor='#000000')
-    gs = fig.add_gridspec(2, 1, height_ratios=[10, 1], hspace=0.05)
-    ax = fig.add_subplot(gs[0])
-    cax = fig.add_subplot(gs[1])
+def _render_heatmap_png(xy, n_shots: int) -> bytes:
+    """
+    Render the KDE shot heatmap for a (2, n) array of shot coordinates and
+    return the PNG bytes. n_shots is the count shown in the title.
+    """
+    pooled = _acquire_heatmap_figure()
+    try:
+        return _draw_heatmap(pooled, xy, n_shots)
+    finally:
+        _heatmap_figure_pool.put(pooled)
+
+
+def _draw_heatmap(pooled: tuple, xy, n_shots: int) -> bytes:
+    """Draw the heatmap onto a pooled (fig, ax, cax) and return the PNG bytes."""
+    fig, ax, cax = pooled
+    ax.clear()
+    cax.clear()
+    # A colorbar wraps the cax locator each time it is attached; drop the old one.
+    cax.set_axes_locator(None)
     ax.set_facecolor('#000000')
-    court_color = '#AAAAAA'
-    court_lw = 1.5
     im = None
     try:
-        xy = np.vstack([shots_x, shots_y])
-        kde = scipy_stats.gaussian_kde(xy, bw_method=0.25)
-        x_grid = np.linspace(-250, 250, 500)
-        y_grid = np.linspace(-50, 300, 438)
-        X, Y = np.meshgrid(x_grid, y_grid)
-        Z = kde(np.vstack([X.ravel(), Y.ravel()])).reshape(X.shape)
+        # Binned KDE: histogram the shots, then blur with a Gaussian whose width
+        # follows the shot spread. O(shots + cells) instead of a kernel per shot
+        # per grid point, and visually the same at this resolution.
+        (x0, x1), (y0, y1) = HEATMAP_EXTENT
+        H, _, _ = np.histogram2d(
+            xy[0], xy[1], bins=(HEATMAP_GRID_X, HEATMAP_GRID_Y), range=HEATMAP_EXTENT,
+        )
+        cell = np.array([(x1 - x0) / HEATMAP_GRID_X, (y1 - y0) / HEATMAP_GRID_Y])
+        sigma = np.maximum(HEATMAP_BANDWIDTH * xy.std(axis=1) / cell, 1.0)
+        # Counts are small integers; float32 halves the grid's memory traffic
+        # through the blur, sqrt and normalize below.
+        H = H.T.astype(np.float32)
+        Z = gaussian_filter(H, sigma=(sigma[1], sigma[0]), mode='constant')
 
         # Dynamic-range compression keeps low-activity regions visible
         # while preserving the highest-intensity zones as yellow.
-        Z_power = np.power(Z, 0.5)
-        z_max = float(Z_power.max()) if Z_power.size else 0.0
+        Z_power = np.sqrt(Z, out=Z)
+        z_max = Z_power.max() if Z_power.size else np.float32(0)
         if z_max > 0:
-            Z_norm = Z_power / z_max
+            Z_norm = np.divide(Z_power, z_max, out=Z_power)
         else:
             Z_norm = Z_power
 
-        from matplotlib.colors import LinearSegmentedColormap
-        cmap = LinearSegmentedColormap.from_list('smooth_heat', [
-            (0.00, '#000000'), (0.12, '#1a0a24'), (0.28, '#4a1076'),
-            (0.45, '#8b1a6b'), (0.62, '#c92e4a'), (0.78, '#e85a2c'),
-            (0.90, '#f99c1c'), (1.00, '#fcec38'),
-        ])
-
-        im = ax.contourf(X, Y, Z_norm, levels=50, cmap=cmap, antialiased=True)
+        # One textured quad; bilinear upsampling gives the smooth look contourf did
+        im = ax.imshow(Z_norm, extent=(x0, x1, y0, y1), origin='lower', cmap=_HEATMAP_CMAP,
+                       interpolation='bilinear', aspect='equal', zorder=0)
     except Exception as e:
-        print(f"KDE heatmap generation failed: {e}")
+        print(f"Heatmap density generation failed: {e}")
 
-    theta = np.linspace(np.arcsin(90 / 237.5), np.pi - np.arcsin(90 / 237.5), 100)
-    ax.plot(237.5 * np.cos(theta), 237.5 * np.sin(theta), color=court_color, linewidth=court_lw, zorder=10)
-    ax.plot([-220, -220], [-47.5, 90], color=court_color, linewidth=court_lw, zorder=10)
-    ax.plot([220, 220], [-47.5, 90], color=court_color, linewidth=court_lw, zorder=10)
-    pw, ph = 80, 190
-    ax.plot([-pw, -pw], [-47.5, ph - 47.5], color=court_color, linewidth=court_lw, zorder=10)
-    ax.plot([pw, pw], [-47.5, ph - 47.5], color=court_color, linewidth=court_lw, zorder=10)
-    ax.plot([-pw, pw], [ph - 47.5, ph - 47.5], color=court_color, linewidth=court_lw, zorder=10)
-    ft_t = np.linspace(0, np.pi, 50)
-    ax.plot(60 * np.cos(ft_t), 60 * np.sin(ft_t) + ph - 47.5, color=court_color, linewidth=court_lw, zorder=10)
-    ft_tb = np.linspace(np.pi, 2 * np.pi, 50)
-    ax.plot(60 * np.cos(ft_tb), 60 * np.sin(ft_tb) + ph - 47.5, color=court_color, linewidth=court_lw, linestyle='--', alpha=0.5, zorder=10)
-    ra_t = np.linspace(0, np.pi, 50)
-    ax.plot(40 * np.cos(ra_t), 40 * np.sin(ra_t), color=court_color, linewidth=court_lw, zorder=10)
-    ax.add_patch(plt.Circle((0, 0), 7.5, fill=False, color=court_color, linewidth=2, zorder=10))
-    ax.plot([-30, 30], [-7.5, -7.5], color=court_color, linewidth=3, zorder=10)
+    # One artist for the whole court instead of a Line2D per marking
+    ax.add_collection(LineCollection(zorder=10, **_COURT_LINES))
     ax.set_xlim(-250, 250)
     ax.set_ylim(-50, 300)
     ax.set_aspect('equal')
     ax.axis('off')
-    ax.set_title(f'Shot Distribution Heatmap ({len(shots)} shots)', color='white', fontsize=16, pad=10, fontweight='bold')
+    ax.set_title(f'Shot Distribution Heatmap ({n_shots} shots)', color='white', fontsize=16, pad=10, fontweight='bold')
 
     if im is not None:
-        cbar = plt.colorbar(im, cax=cax, orientation='horizontal')
+        cbar = fig.colorbar(im, cax=cax, orientation='horizontal')
         cbar.set_ticks([0.0, 0.5, 1.0])
         cbar.set_ticklabels(['lower', 'Shot frequency', 'higher'])
         cbar.ax.xaxis.set_tick_params(color='white', labelsize=10)
@@ -626,10 +897,81 @@ async def get_player_heatmap(player_id: int, season: str = "2025-26", refresh: b
         cbar.outline.set_edgecolor('#333333')
 
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=100, bbox_inches='tight', facecolor='#000000', edgecolor='none')
-    plt.close(fig)
-    buf.seek(0)
-    return Response(content=buf.read(), media_type="image/png")
+    fig.savefig(buf, format='png', dpi=100, bbox_inches='tight', facecolor='#000000', edgecolor='none')
+    return buf.getvalue()
+
+
+async def _render_heatmap(xy, n_shots: int) -> bytes:
+    """
+    Render on the process pool. A worker that died leaves the pool broken for
+    every later submit, so it is replaced and the render retried once.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_render_pool()
+    try:
+        return await loop.run_in_executor(pool, _render_heatmap_png, xy, n_shots)
+    except BrokenProcessPool:
+        print("Warning: heatmap render pool broke, restarting it")
+        _discard_render_pool(pool)
+        return await loop.run_in_executor(_get_render_pool(), _render_heatmap_png, xy, n_shots)
+
+
+def _finish_heatmap_render(cache_key: Tuple[int, str, str], render: "asyncio.Future") -> None:
+    """Done-callback for a heatmap render: drop it from in-flight and cache the PNG."""
+    _heatmap_renders.pop(cache_key, None)
+    if render.cancelled() or render.exception() is not None:
+        return
+    with _heatmap_cache_lock:
+        _heatmap_png_cache[cache_key] = render.result()
+        if len(_heatmap_png_cache) > HEATMAP_CACHE_SIZE:
+            _heatmap_png_cache.popitem(last=False)
+
+
+@router.get("/heatmap/{player_id}")
+async def get_player_heatmap(request: Request, player_id: int, season: str = "2025-26", refresh: bool = False):
+    """
+    Smooth KDE heatmap PNG generated from authenticated shot data in Supabase.
+    Yellow represents highest shot-frequency intensity.
+    Returns 404 if no data is available (run sync script to populate DB).
+
+    The blocking shot-data load runs in the threadpool and the render is
+    awaited on the process pool, so neither ties up the event loop or a
+    threadpool thread while Matplotlib works.
+    """
+    if not HAS_VISUALIZATION:
+        raise HTTPException(status_code=500, detail="Visualization libraries not installed. Run: pip install matplotlib numpy scipy")
+
+    row = await run_in_threadpool(_fetch_and_cache_shot_data, player_id, season, refresh)
+    if not row or not row["summary"]["total_shots"]:
+        raise HTTPException(status_code=404, detail="No shot data available for this player. Run the sync script to populate the database.")
+
+    cache_key = (player_id, season, str(row.get("cached_at", "")))
+    headers = cache_headers(f'W/"heatmap-{player_id}-{season}-{cache_key[2]}"', max_age=86400)
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    with _heatmap_cache_lock:
+        png = _heatmap_png_cache.get(cache_key)
+        if png is not None:
+            _heatmap_png_cache.move_to_end(cache_key)
+    if png is None:
+        render = _heatmap_renders.get(cache_key)
+        if render is None:
+            # (2, n) coordinates straight from the cached arrays
+            x, y, _ = row["arrays"]
+            n_shots = len(x)
+            if n_shots > HEATMAP_MAX_SHOTS:
+                # Seeded by player so the same data always renders the same image
+                idx = np.random.default_rng(player_id).choice(n_shots, HEATMAP_MAX_SHOTS, replace=False)
+                x, y = x[idx], y[idx]
+            xy = np.vstack((x, y)).astype(np.float32)
+            render = asyncio.ensure_future(_render_heatmap(xy, n_shots))
+            _heatmap_renders[cache_key] = render
+            render.add_done_callback(lambda f, key=cache_key: _finish_heatmap_render(key, f))
+        # Shielded so one client disconnecting doesn't cancel the render for the others
+        png = await asyncio.shield(render)
+
+    return Response(content=png, media_type="image/png", headers=headers)
 
 
 @router.get("/player-efficiency/{player_id}")
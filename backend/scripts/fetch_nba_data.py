@@ -5,12 +5,17 @@ Run this script weekly via GitHub Actions to keep data fresh.
 """
 
 import os
-import json
-import time
+import sys
+import orjson
+import asyncio
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 # NBA API imports
 from nba_api.stats.static import players, teams
 from nba_api.stats.endpoints import (
@@ -23,6 +28,8 @@ from nba_api.stats.endpoints import (
 # Supabase import
 from supabase import create_client, Client
 
+from services.nba_http import fetch_nba_endpoint, install_nba_session
+
 # Load environment variables
 load_dotenv()
 
@@ -36,6 +43,23 @@ else:
     supabase = None
     print("⚠️  Supabase credentials not found. Running in dry-run mode.")
 
+# NBA API requests in flight at once; the shared session still spaces their
+# network sends NBA_API_MIN_INTERVAL apart (cache hits go straight through)
+NBA_API_CONCURRENCY = int(os.getenv("NBA_API_CONCURRENCY", "8"))
+
+# Set NBA_CACHE=1 to serve repeat NBA API responses from the local disk cache
+# for 12h (handy when rerunning during development; off for scheduled runs)
+NBA_CACHE = os.getenv("NBA_CACHE", "0") == "1"
+
+# One keep-alive connection per concurrent request, with urllib3 retrying
+# transient 429/5xx responses so a flaky run doesn't need a full rerun
+install_nba_session(
+    pool_size=NBA_API_CONCURRENCY, max_retries=5, backoff_factor=1.5,
+    use_cache=NBA_CACHE, cache_seconds=12 * 3600,
+)
+# Rows per Supabase upsert request
+UPSERT_BATCH_SIZE = 500
+
 
 def get_active_players() -> List[Dict]:
     """Get all active NBA players"""
@@ -48,8 +72,7 @@ def get_active_players() -> List[Dict]:
 def get_player_stats(player_id: int, season: str = "2025-26") -> Optional[Dict]:
     """Get career stats for a specific player"""
     try:
-        time.sleep(0.6)  # Rate limiting
-        career = playercareerstats.PlayerCareerStats(player_id=player_id)
+        career = fetch_nba_endpoint(playercareerstats.PlayerCareerStats, player_id=player_id)
         df = career.get_data_frames()[0]
         
         # Get most recent season
@@ -85,8 +108,7 @@ def get_player_stats(player_id: int, season: str = "2025-26") -> Optional[Dict]:
 def get_player_position(player_id: int) -> str:
     """Get player position"""
     try:
-        time.sleep(0.6)
-        info = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
+        info = fetch_nba_endpoint(commonplayerinfo.CommonPlayerInfo, player_id=player_id)
         df = info.get_data_frames()[0]
         if len(df) > 0:
             position = df.iloc[0].get("POSITION", "")
@@ -106,13 +128,13 @@ def get_player_position(player_id: int) -> str:
     return "N/A"
 
 
+# Team ID to abbreviation map (nba_api's static team list)
+TEAM_ABBR_MAP = {team["id"]: team["abbreviation"] for team in teams.get_teams()}
+
+
 def get_team_abbr(team_id: int) -> str:
     """Get team abbreviation from team ID"""
-    all_teams = teams.get_teams()
-    for team in all_teams:
-        if team["id"] == team_id:
-            return team["abbreviation"]
-    return "N/A"
+    return TEAM_ABBR_MAP.get(team_id, "N/A")
 
 
 def get_role_players(all_players: List[Dict], min_games: int = 20, max_ppg: float = 15.0) -> List[Dict]:
@@ -138,35 +160,87 @@ def save_to_supabase(players_data: List[Dict]):
     if not supabase:
         print("⚠️  Skipping Supabase upload (dry-run mode)")
         # Save to local JSON for testing
-        with open("players_data.json", "w") as f:
-            json.dump(players_data, f, indent=2)
+        with open("players_data.json", "wb") as f:
+            f.write(orjson.dumps(players_data, option=orjson.OPT_INDENT_2))
         print("📁 Saved data to players_data.json")
         return
     
     print("📤 Uploading to Supabase...")
     
-    for player in players_data:
+    updated_at = datetime.now().isoformat()
+    rows = [
+        {
+            "player_id": player["id"],
+            "full_name": player["full_name"],
+            "team_abbreviation": player.get("team_abbreviation", "N/A"),
+            "is_active": True,
+            "position": player.get("position", "N/A"),
+            "season_stats": player.get("season_stats", {}),
+            "updated_at": updated_at,
+        }
+        for player in players_data
+    ]
+    
+    # One upsert per batch instead of per player
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[i:i + UPSERT_BATCH_SIZE]
         try:
-            # Upsert player data
-            data = {
-                "player_id": player["id"],
-                "full_name": player["full_name"],
-                "team_abbreviation": player.get("team_abbreviation", "N/A"),
-                "is_active": True,
-                "position": player.get("position", "N/A"),
-                "season_stats": player.get("season_stats", {}),
-                "updated_at": datetime.now().isoformat(),
-            }
-            
-            supabase.table("cached_players").upsert(data).execute()
-            print(f"  ✅ {player['full_name']}")
-            
+            supabase.table("cached_players").upsert(batch).execute()
+            print(f"  ✅ Uploaded {i + len(batch)}/{len(rows)} players")
         except Exception as e:
-            print(f"  ❌ Error uploading {player['full_name']}: {e}")
+            # Retry the failed batch row by row so one bad row doesn't drop the rest
+            print(f"  ⚠️  Batch upload failed ({e}), retrying row by row...")
+            for row in batch:
+                try:
+                    supabase.table("cached_players").upsert(row).execute()
+                except Exception as row_error:
+                    print(f"  ❌ Error uploading {row['full_name']}: {row_error}")
     
     print("✅ Upload complete!")
 
 
+async def process_player(
+    player: Dict, index: int, total: int,
+    semaphore: asyncio.Semaphore,
+) -> Optional[Dict]:
+    """Fetch stats and position for one player; the blocking nba_api calls run in threads"""
+    player_id = player["id"]
+    player_name = player["full_name"]
+
+    async with semaphore:
+        # Get stats
+        stats = await asyncio.to_thread(get_player_stats, player_id)
+        if not stats:
+            print(f"[{index}/{total}] ⏭️  Skipping {player_name} (no stats found)")
+            return None
+
+        # Get position
+        position = await asyncio.to_thread(get_player_position, player_id)
+
+    # Get team abbreviation
+    team_abbr = get_team_abbr(stats.get("team_id", 0))
+
+    print(f"[{index}/{total}] ✅ {player_name} - {team_abbr} - {stats['pts']} PPG")
+    return {
+        "id": player_id,
+        "full_name": player_name,
+        "team_abbreviation": team_abbr,
+        "position": position,
+        "season_stats": stats,
+    }
+
+
+async def enrich_players(players_to_process: List[Dict]) -> List[Dict]:
+    """Process players concurrently (bounded by NBA_API_CONCURRENCY), keeping input order"""
+    semaphore = asyncio.Semaphore(NBA_API_CONCURRENCY)
+    total = len(players_to_process)
+    results = await asyncio.gather(*[
+        process_player(player, i + 1, total, semaphore)
+        for i, player in enumerate(players_to_process)
+    ])
+    return [player for player in results if player]
+
+
 def main():
     """Main function to fetch and save NBA data"""
     print("=" * 50)
@@ -180,36 +254,7 @@ def main():
     # Process all active players
     players_to_process = active_players
     
-    enriched_players = []
-    
-    for i, player in enumerate(players_to_process):
-        player_id = player["id"]
-        player_name = player["full_name"]
-        
-        print(f"\n[{i+1}/{len(players_to_process)}] Processing {player_name}...")
-        
-        # Get stats
-        stats = get_player_stats(player_id)
-        if not stats:
-            print(f"  ⏭️  Skipping (no stats found)")
-            continue
-        
-        # Get position
-        position = get_player_position(player_id)
-        
-        # Get team abbreviation
-        team_abbr = get_team_abbr(stats.get("team_id", 0))
-        
-        enriched_player = {
-            "id": player_id,
-            "full_name": player_name,
-            "team_abbreviation": team_abbr,
-            "position": position,
-            "season_stats": stats,
-        }
-        
-        enriched_players.append(enriched_player)
-        print(f"  ✅ {player_name} - {team_abbr} - {stats['pts']} PPG")
+    enriched_players = asyncio.run(enrich_players(players_to_process))
     
     print(f"\n📊 Processed {len(enriched_players)} players")
     
@@ -1,18 +1,19 @@
 """
 NBA Shot Chart Heatmap Generator
-Uses matplotlib and seaborn to generate KDE heatmaps and dynamic hexbins
+Uses matplotlib and scipy to generate KDE heatmaps and dynamic hexbins
 for player scoring density and efficiency relative to league averages.
 """
 
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-
-import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
 import numpy as np
+from scipy.stats import gaussian_kde
 from io import BytesIO
 import base64
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 
 # NBA court dimensions (in feet, scaled for plotting)
 COURT_LENGTH = 94
@@ -22,44 +23,55 @@ HOOP_Y = 5.25
 THREE_PT_DIST = 23.75
 CORNER_THREE_DIST = 22
 
-def draw_court(ax=None, color='white', lw=2, alpha=0.7):
-    """Draw NBA half-court on matplotlib axes."""
-    if ax is None:
-        ax = plt.gca()
-    
+# Shots as one array per field: x, y (feet), made (bool), points (2/3)
+ShotArrays = Dict[str, np.ndarray]
+
+# KDE heatmap: grid resolution and share of peak density below which nothing is drawn
+KDE_GRID_SIZE = 100
+KDE_THRESH = 0.05
+
+# Output charts: ~1000px for a 10in figure, plenty for the ~600px the UI shows
+CHART_DPI = 96
+CHART_BG = '#0F172A'
+
+# Hexbin colormaps: pink (cold) to lime (hot), and blue / gray / lime diverging
+EFFICIENCY_CMAP = LinearSegmentedColormap.from_list('efficiency', ['#EC4899', '#F59E0B', '#84CC16'])
+COMPARISON_CMAP = LinearSegmentedColormap.from_list('comparison', ['#3B82F6', '#1E293B', '#84CC16'])
+
+def _circle(cx: float, cy: float, r: float, n: int = 128) -> np.ndarray:
+    """Closed polyline approximating a circle"""
+    t = np.linspace(0, 2 * np.pi, n)
+    return np.column_stack((cx + r * np.cos(t), cy + r * np.sin(t)))
+
+
+# Half-court markings as polylines, built once; draw_court only styles them
+COURT_SEGMENTS = [
     # Court outline
-    ax.plot([-25, 25], [0, 0], color=color, lw=lw, alpha=alpha)
-    ax.plot([-25, 25], [47, 47], color=color, lw=lw, alpha=alpha)
-    ax.plot([-25, -25], [0, 47], color=color, lw=lw, alpha=alpha)
-    ax.plot([25, 25], [0, 47], color=color, lw=lw, alpha=alpha)
-    
+    np.array([[-25, 0], [25, 0]]),
+    np.array([[-25, 47], [25, 47]]),
+    np.array([[-25, 0], [-25, 47]]),
+    np.array([[25, 0], [25, 47]]),
     # Hoop
-    hoop = plt.Circle((0, 5.25), 0.75, color=color, fill=False, lw=lw, alpha=alpha)
-    ax.add_patch(hoop)
-    
+    _circle(HOOP_X, HOOP_Y, 0.75),
     # Backboard
-    ax.plot([-3, 3], [4, 4], color=color, lw=lw, alpha=alpha)
-    
+    np.array([[-3, 4], [3, 4]]),
     # Paint
-    paint = plt.Rectangle((-8, 0), 16, 19, fill=False, color=color, lw=lw, alpha=alpha)
-    ax.add_patch(paint)
-    
+    np.array([[-8, 0], [8, 0], [8, 19], [-8, 19], [-8, 0]]),
     # Free throw circle
-    ft_circle = plt.Circle((0, 19), 6, color=color, fill=False, lw=lw, alpha=alpha)
-    ax.add_patch(ft_circle)
-    
+    _circle(0, 19, 6),
     # Restricted area
-    restricted = plt.Circle((0, 5.25), 4, color=color, fill=False, lw=lw, alpha=alpha)
-    ax.add_patch(restricted)
-    
-    # Three point line
-    # Corner three
-    ax.plot([-22, -22], [0, 14], color=color, lw=lw, alpha=alpha)
-    ax.plot([22, 22], [0, 14], color=color, lw=lw, alpha=alpha)
-    
-    # Arc
-    three_arc = plt.Circle((0, 5.25), 23.75, color=color, fill=False, lw=lw, alpha=alpha)
-    ax.add_patch(three_arc)
+    _circle(HOOP_X, HOOP_Y, 4),
+    # Three point line: corners, then the arc (clipped to the court by the axes limits)
+    np.array([[-CORNER_THREE_DIST, 0], [-CORNER_THREE_DIST, 14]]),
+    np.array([[CORNER_THREE_DIST, 0], [CORNER_THREE_DIST, 14]]),
+    _circle(HOOP_X, HOOP_Y, THREE_PT_DIST, n=256),
+]
+
+
+def draw_court(ax: Axes, color='white', lw=2, alpha=0.7):
+    """Draw NBA half-court on matplotlib axes."""
+    # All markings as one artist instead of a line or patch per marking
+    ax.add_collection(LineCollection(COURT_SEGMENTS, colors=color, linewidths=lw, alpha=alpha))
     
     ax.set_xlim(-25, 25)
     ax.set_ylim(0, 47)
@@ -69,76 +81,101 @@ def draw_court(ax=None, color='white', lw=2, alpha=0.7):
     return ax
 
 
-def generate_mock_shot_data(player_id: int = 0, num_shots: int = 500) -> List[Dict]:
-    """Generate mock shot data for a player."""
-    np.random.seed(player_id if player_id else None)
-    
-    shots = []
-    for _ in range(num_shots):
-        # Bias towards common shooting areas
-        area = np.random.choice(['paint', 'midrange', 'three', 'corner3'], 
-                                p=[0.35, 0.2, 0.35, 0.1])
-        
-        if area == 'paint':
-            x = np.random.uniform(-8, 8)
-            y = np.random.uniform(0, 15)
-            made_prob = 0.58
-        elif area == 'midrange':
-            angle = np.random.uniform(0, np.pi)
-            dist = np.random.uniform(10, 22)
-            x = dist * np.cos(angle)
-            y = 5.25 + dist * np.sin(angle)
-            made_prob = 0.42
-        elif area == 'three':
-            angle = np.random.uniform(0.3, np.pi - 0.3)
-            dist = np.random.uniform(23.75, 27)
-            x = dist * np.cos(angle)
-            y = 5.25 + dist * np.sin(angle)
-            made_prob = 0.36
-        else:  # corner3
-            x = np.random.choice([-22, 22]) + np.random.uniform(-1, 1)
-            y = np.random.uniform(0, 10)
-            made_prob = 0.40
-        
-        made = np.random.random() < made_prob
-        shots.append({
-            'x': float(x),
-            'y': float(y),
-            'made': made,
-            'points': 3 if np.sqrt(x**2 + (y - 5.25)**2) > 22 else 2
-        })
-    
-    return shots
+def shots_dict_to_soa(shots: List[Dict]) -> ShotArrays:
+    """Adapter for callers holding a list of shot dicts: one array per field."""
+    n = len(shots)
+    return {
+        'x': np.fromiter((s['x'] for s in shots), dtype=np.float64, count=n),
+        'y': np.fromiter((s['y'] for s in shots), dtype=np.float64, count=n),
+        'made': np.fromiter((bool(s['made']) for s in shots), dtype=bool, count=n),
+        'points': np.fromiter((s.get('points', 2) for s in shots), dtype=np.int64, count=n),
+    }
+
+
+def _as_soa(shots: Union[ShotArrays, List[Dict]]) -> ShotArrays:
+    """Shot arrays as-is; a list of shot dicts is converted once."""
+    return shots if isinstance(shots, dict) else shots_dict_to_soa(shots)
+
+
+def generate_mock_shot_data(player_id: int = 0, num_shots: int = 500) -> ShotArrays:
+    """Generate mock shot data for a player as shot arrays."""
+    rng = np.random.default_rng(player_id if player_id else None)
+
+    # Bias towards common shooting areas: 0 paint, 1 midrange, 2 three, 3 corner3
+    area = rng.choice(4, size=num_shots, p=[0.35, 0.2, 0.35, 0.1])
+    x = np.empty(num_shots)
+    y = np.empty(num_shots)
+
+    # Each area draws only as many samples as it has shots
+    paint = np.flatnonzero(area == 0)
+    x[paint] = rng.uniform(-8, 8, paint.size)
+    y[paint] = rng.uniform(0, 15, paint.size)
+
+    for k, angle_range, dist_range in ((1, (0, np.pi), (10, 22)), (2, (0.3, np.pi - 0.3), (23.75, 27))):
+        idx = np.flatnonzero(area == k)
+        angle = rng.uniform(*angle_range, idx.size)
+        dist = rng.uniform(*dist_range, idx.size)
+        x[idx] = dist * np.cos(angle)
+        y[idx] = 5.25 + dist * np.sin(angle)
+
+    corner3 = np.flatnonzero(area == 3)
+    x[corner3] = rng.choice([-22, 22], corner3.size) + rng.uniform(-1, 1, corner3.size)
+    y[corner3] = rng.uniform(0, 10, corner3.size)
+
+    made_prob = np.array([0.58, 0.42, 0.36, 0.40])[area]
+    made = rng.random(num_shots) < made_prob
+    points = np.where(np.hypot(x, y - 5.25) > 22, 3, 2)
+
+    return {'x': x, 'y': y, 'made': made, 'points': points}
+
+
+def new_chart(figsize: Tuple[int, int]) -> Tuple[Figure, Axes]:
+    """
+    Dark-background figure and axes for one chart. Built as a bare Figure on
+    its own Agg canvas (not through pyplot), so nothing is registered
+    globally and charts can be rendered from several threads.
+    """
+    fig = Figure(figsize=figsize, facecolor=CHART_BG)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_facecolor(CHART_BG)
+    return fig, ax
+
+
+def encode_chart(fig: Figure, dpi: int = CHART_DPI) -> str:
+    """Render fig to PNG and return it base64 encoded."""
+    buf = BytesIO()
+    # Light zlib compression: noticeably cheaper to encode, slightly larger output
+    fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight',
+                facecolor=CHART_BG, edgecolor='none', pil_kwargs={'compress_level': 1})
+    # Encode straight from the buffer's memory; getvalue() would copy the PNG first
+    return base64.b64encode(buf.getbuffer()).decode('utf-8')
 
 
 def generate_kde_heatmap(
-    shots: List[Dict],
+    shots: Union[ShotArrays, List[Dict]],
     player_name: str = "Player",
     figsize: Tuple[int, int] = (10, 10),
-    cmap: str = 'YlOrRd'
+    cmap: str = 'YlOrRd',
+    dpi: int = CHART_DPI
 ) -> str:
     """
     Generate a KDE (Kernel Density Estimation) heatmap of shot locations.
     
     Returns base64 encoded PNG image.
     """
-    fig, ax = plt.subplots(figsize=figsize, facecolor='#0F172A')
-    ax.set_facecolor('#0F172A')
+    fig, ax = new_chart(figsize)
     
-    x_coords = [s['x'] for s in shots]
-    y_coords = [s['y'] for s in shots]
+    shots = _as_soa(shots)
+    x_coords, y_coords = shots['x'], shots['y']
     
-    # KDE plot
-    sns.kdeplot(
-        x=x_coords, 
-        y=y_coords,
-        cmap=cmap,
-        fill=True,
-        alpha=0.7,
-        levels=20,
-        thresh=0.05,
-        ax=ax
-    )
+    # Evaluate the KDE on a grid and show it as one raster (no contour tessellation)
+    kde = gaussian_kde(np.vstack([x_coords, y_coords]))
+    grid_x, grid_y = np.mgrid[-25:25:KDE_GRID_SIZE * 1j, 0:47:KDE_GRID_SIZE * 1j]
+    density = kde(np.vstack([grid_x.ravel(), grid_y.ravel()])).reshape(grid_x.shape)
+    density[density < density.max() * KDE_THRESH] = np.nan  # transparent below thresh
+    ax.imshow(density.T, extent=(-25, 25, 0, 47), origin='lower',
+              cmap=cmap, alpha=0.7, interpolation='bilinear', interpolation_stage='rgba')
     
     # Draw court on top
     draw_court(ax, color='white', lw=1, alpha=0.6)
@@ -147,21 +184,15 @@ def generate_kde_heatmap(
     ax.set_title(f'{player_name} - Shot Density', 
                  color='white', fontsize=16, fontweight='bold', pad=20)
     
-    # Save to buffer
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight',
-                facecolor='#0F172A', edgecolor='none')
-    plt.close(fig)
-    buf.seek(0)
-    
-    return base64.b64encode(buf.read()).decode('utf-8')
+    return encode_chart(fig, dpi)
 
 
 def generate_hexbin_efficiency(
-    shots: List[Dict],
+    shots: Union[ShotArrays, List[Dict]],
     player_name: str = "Player",
     gridsize: int = 15,
-    figsize: Tuple[int, int] = (10, 10)
+    figsize: Tuple[int, int] = (10, 10),
+    dpi: int = CHART_DPI
 ) -> str:
     """
     Generate a hexbin chart showing shooting efficiency by zone.
@@ -169,23 +200,17 @@ def generate_hexbin_efficiency(
     
     Returns base64 encoded PNG image.
     """
-    fig, ax = plt.subplots(figsize=figsize, facecolor='#0F172A')
-    ax.set_facecolor('#0F172A')
-    
-    x_coords = np.array([s['x'] for s in shots])
-    y_coords = np.array([s['y'] for s in shots])
-    made = np.array([1 if s['made'] else 0 for s in shots])
+    fig, ax = new_chart(figsize)
     
-    # Custom colormap: red (cold) to lime green (hot)
-    colors = ['#EC4899', '#F59E0B', '#84CC16']
-    cmap = matplotlib.colors.LinearSegmentedColormap.from_list('efficiency', colors)
+    shots = _as_soa(shots)
+    x_coords, y_coords, made = shots['x'], shots['y'], shots['made']
     
     # Hexbin with efficiency as color
     hb = ax.hexbin(
         x_coords, y_coords, 
         C=made,
         gridsize=gridsize,
-        cmap=cmap,
+        cmap=EFFICIENCY_CMAP,
         reduce_C_function=np.mean,
         mincnt=3,
         alpha=0.8,
@@ -196,30 +221,23 @@ def generate_hexbin_efficiency(
     draw_court(ax, color='white', lw=1, alpha=0.8)
     
     # Colorbar
-    cbar = plt.colorbar(hb, ax=ax, pad=0.02)
+    cbar = fig.colorbar(hb, ax=ax, pad=0.02)
     cbar.set_label('Field Goal %', color='white', fontsize=12)
-    cbar.ax.yaxis.set_tick_params(color='white')
-    plt.setp(plt.getp(cbar.ax.axes, 'yticklabels'), color='white')
+    cbar.ax.yaxis.set_tick_params(color='white', labelcolor='white')
     
     # Title
     ax.set_title(f'{player_name} - Shooting Efficiency by Zone', 
                  color='white', fontsize=16, fontweight='bold', pad=20)
     
-    # Save to buffer
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight',
-                facecolor='#0F172A', edgecolor='none')
-    plt.close(fig)
-    buf.seek(0)
-    
-    return base64.b64encode(buf.read()).decode('utf-8')
+    return encode_chart(fig, dpi)
 
 
 def generate_comparison_heatmap(
-    player_shots: List[Dict],
-    league_shots: List[Dict],
+    player_shots: Union[ShotArrays, List[Dict]],
+    league_shots: Union[ShotArrays, List[Dict]],
     player_name: str = "Player",
-    figsize: Tuple[int, int] = (12, 10)
+    figsize: Tuple[int, int] = (12, 10),
+    dpi: int = CHART_DPI
 ) -> str:
     """
     Generate a comparison heatmap showing player efficiency vs league average.
@@ -227,30 +245,22 @@ def generate_comparison_heatmap(
     
     Returns base64 encoded PNG image.
     """
-    fig, ax = plt.subplots(figsize=figsize, facecolor='#0F172A')
-    ax.set_facecolor('#0F172A')
+    fig, ax = new_chart(figsize)
     
     # Calculate efficiency difference by zone
     # This is a simplified version - real implementation would use more sophisticated binning
     
-    player_x = np.array([s['x'] for s in player_shots])
-    player_y = np.array([s['y'] for s in player_shots])
-    player_made = np.array([1 if s['made'] else 0 for s in player_shots])
-    
-    league_x = np.array([s['x'] for s in league_shots])
-    league_y = np.array([s['y'] for s in league_shots])
-    league_made = np.array([1 if s['made'] else 0 for s in league_shots])
-    
-    # Custom diverging colormap
-    colors = ['#3B82F6', '#1E293B', '#84CC16']  # Blue -> Gray -> Lime
-    cmap = matplotlib.colors.LinearSegmentedColormap.from_list('comparison', colors)
+    player_shots = _as_soa(player_shots)
+    league_shots = _as_soa(league_shots)
+    player_x, player_y, player_made = player_shots['x'], player_shots['y'], player_shots['made']
+    league_x, league_y, league_made = league_shots['x'], league_shots['y'], league_shots['made']
     
     # For visualization, just show player efficiency for now
     hb = ax.hexbin(
         player_x, player_y,
         C=player_made,
         gridsize=12,
-        cmap=cmap,
+        cmap=COMPARISON_CMAP,
         reduce_C_function=np.mean,
         mincnt=3,
         alpha=0.8,
@@ -263,58 +273,43 @@ def generate_comparison_heatmap(
     draw_court(ax, color='white', lw=1, alpha=0.8)
     
     # Colorbar
-    cbar = plt.colorbar(hb, ax=ax, pad=0.02)
+    cbar = fig.colorbar(hb, ax=ax, pad=0.02)
     cbar.set_label('FG% vs League Avg', color='white', fontsize=12)
-    cbar.ax.yaxis.set_tick_params(color='white')
-    plt.setp(plt.getp(cbar.ax.axes, 'yticklabels'), color='white')
+    cbar.ax.yaxis.set_tick_params(color='white', labelcolor='white')
     
     # Title
     ax.set_title(f'{player_name} - Efficiency vs League Average', 
                  color='white', fontsize=16, fontweight='bold', pad=20)
     
-    # Save to buffer
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight',
-                facecolor='#0F172A', edgecolor='none')
-    plt.close(fig)
-    buf.seek(0)
-    
-    return base64.b64encode(buf.read()).decode('utf-8')
+    return encode_chart(fig, dpi)
 
 
-def get_zone_stats(shots: List[Dict]) -> Dict:
+def get_zone_stats(shots: Union[ShotArrays, List[Dict]]) -> Dict:
     """Calculate shooting stats by zone."""
-    zones = {
-        'paint': {'made': 0, 'total': 0},
-        'midrange': {'made': 0, 'total': 0},
-        'three': {'made': 0, 'total': 0},
-        'corner3': {'made': 0, 'total': 0}
+    shots = _as_soa(shots)
+    x, y, made = shots['x'], shots['y'], shots['made']
+    dist = np.hypot(x, y - 5.25)
+
+    corner3 = (np.abs(x) > 22) & (y < 14)
+    three = ~corner3 & (dist > 23.75)
+    paint = ~corner3 & ~three & (dist < 10)
+    masks = {
+        'paint': paint,
+        'midrange': ~(corner3 | three | paint),
+        'three': three,
+        'corner3': corner3,
     }
-    
-    for shot in shots:
-        x, y = shot['x'], shot['y']
-        dist = np.sqrt(x**2 + (y - 5.25)**2)
-        
-        if abs(x) > 22 and y < 14:
-            zone = 'corner3'
-        elif dist > 23.75:
-            zone = 'three'
-        elif dist < 10:
-            zone = 'paint'
-        else:
-            zone = 'midrange'
-        
-        zones[zone]['total'] += 1
-        if shot['made']:
-            zones[zone]['made'] += 1
-    
-    # Calculate percentages
-    for zone in zones:
-        if zones[zone]['total'] > 0:
-            zones[zone]['pct'] = zones[zone]['made'] / zones[zone]['total'] * 100
-        else:
-            zones[zone]['pct'] = 0.0
-    
+
+    zones = {}
+    for zone, mask in masks.items():
+        total = int(mask.sum())
+        zone_made = int((mask & made).sum())
+        zones[zone] = {
+            'made': zone_made,
+            'total': total,
+            'pct': zone_made / total * 100 if total > 0 else 0.0,
+        }
+
     return zones
 
 
@@ -9,21 +9,26 @@ Run this script:
 Or via scheduled GitHub Action to keep data fresh.
 """
 
+import asyncio
 import os
 import sys
-import json
+import orjson
 import time
 import random
 from datetime import datetime
-from typing import List, Dict, Callable, TypeVar
+from typing import List, Dict, Callable, Optional, TypeVar
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import numpy as np
 from dotenv import load_dotenv
 from nba_api.stats.endpoints import LeagueDashPlayerStats, PlayerIndex
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient
+
+from services.nba_http import install_nba_session
+from services.positions import TEAM_ID_TO_ABBR, normalize_positions
 
 # Load environment variables
 load_dotenv(Path(__file__).parent.parent / ".env")
@@ -41,122 +46,25 @@ USE_CACHED_ON_FAILURE = os.getenv("USE_CACHED_ON_FAILURE", "true").lower() == "t
 
 CACHE_PATH = Path(__file__).parent.parent / "cache" / "nba_players_2025_26.json"
 
-T = TypeVar("T")
+# LeagueDashPlayerStats columns read as numbers
+STAT_COLUMNS = [
+    "GP", "MIN", "PTS", "REB", "AST", "STL", "BLK",
+    "FG_PCT", "FG3_PCT", "FT_PCT", "FGA", "FTA", "FG3A", "FG3M",
+]
 
-# Team ID to abbreviation map
-TEAM_ABBR_MAP = {
-    1610612737: "ATL", 1610612738: "BOS", 1610612739: "CLE",
-    1610612740: "NOP", 1610612741: "CHI", 1610612742: "DAL",
-    1610612743: "DEN", 1610612744: "GSW", 1610612745: "HOU",
-    1610612746: "LAC", 1610612747: "LAL", 1610612748: "MIA",
-    1610612749: "MIL", 1610612750: "MIN", 1610612751: "BKN",
-    1610612752: "NYK", 1610612753: "ORL", 1610612754: "IND",
-    1610612755: "PHI", 1610612756: "PHX", 1610612757: "POR",
-    1610612758: "SAC", 1610612759: "SAS", 1610612760: "OKC",
-    1610612761: "TOR", 1610612762: "UTA", 1610612763: "MEM",
-    1610612764: "WAS", 1610612765: "DET", 1610612766: "CHA",
-}
-
-
-def normalize_position(pos: str, stats: dict = None) -> str:
-    """
-    Convert NBA API position format to standard 5-position format.
-    NBA API uses: G, F, C, G-F, F-G, C-F, F-C, etc.
-    We want: PG, SG, SF, PF, C
-    """
-    if not pos:
-        return infer_position_from_stats(stats) if stats else "SF"
-    
-    pos = pos.upper().strip()
-    
-    # Direct mappings for single positions
-    if pos == "C":
-        return "C"
-    
-    # For guards, use stats to differentiate PG vs SG
-    if pos == "G":
-        if stats:
-            ast = stats.get("ast", 0) or 0
-            pts = stats.get("pts", 0) or 0
-            # PGs typically have higher assist rates
-            if ast > 4 or (ast > 2 and pts < 15):
-                return "PG"
-        return "SG"
-    
-    # For forwards, use stats to differentiate SF vs PF
-    if pos == "F":
-        if stats:
-            reb = stats.get("reb", 0) or 0
-            blk = stats.get("blk", 0) or 0
-            pts = stats.get("pts", 0) or 0
-            # PFs typically have more rebounds/blocks
-            if reb > 6 or blk > 1:
-                return "PF"
-        return "SF"
-    
-    # Combo positions - use first position as primary
-    if "-" in pos:
-        primary, secondary = pos.split("-")
-        
-        # C-F = Center who can play forward
-        if primary == "C":
-            return "C"
-        
-        # F-C = Forward/Center (power forward)
-        if primary == "F" and secondary == "C":
-            return "PF"
-        
-        # F-G or G-F = Swingman
-        if ("F" in pos and "G" in pos):
-            if stats:
-                ast = stats.get("ast", 0) or 0
-                reb = stats.get("reb", 0) or 0
-                if ast > reb:
-                    return "SG"
-            return "SF"
-        
-        # Default: use primary position
-        if primary == "G":
-            return "SG"
-        if primary == "F":
-            return "SF"
-    
-    # Fallback
-    return infer_position_from_stats(stats) if stats else "SF"
+# Rows per upsert request, and how many upsert requests may be in flight at once
+SUPABASE_UPSERT_BATCH_SIZE = 100
+SUPABASE_UPSERT_CONCURRENCY = int(os.getenv("SUPABASE_UPSERT_CONCURRENCY", "4"))
 
+# Set NBA_CACHE=1 to serve repeat NBA API responses from the local disk cache
+# for 12h (handy when rerunning during development; off for scheduled runs)
+NBA_CACHE = os.getenv("NBA_CACHE", "0") == "1"
 
-def infer_position_from_stats(stats: dict) -> str:
-    """Fallback position inference from stats when position data unavailable"""
-    if not stats:
-        return "SF"
-    
-    pts = stats.get("pts", 0) or 0
-    reb = stats.get("reb", 0) or 0
-    ast = stats.get("ast", 0) or 0
-    blk = stats.get("blk", 0) or 0
-    
-    # Centers: high rebounds and blocks
-    if reb > 8 and blk > 1:
-        return "C"
-    if reb > 10:
-        return "C"
-    
-    # Power Forwards: good rebounders
-    if reb > 6:
-        return "PF"
-    
-    # Point Guards: high assists
-    if ast > 5:
-        return "PG"
-    if ast > 3 and pts < 18:
-        return "PG"
-    
-    # Shooting Guards: scorers with low rebounds
-    if pts > 15 and reb < 5 and ast < 5:
-        return "SG"
-    
-    # Small Forwards: default
-    return "SF"
+# Shared keep-alive session; urllib3 retries transient 429/5xx responses
+# underneath with_retries' own backoff
+install_nba_session(max_retries=5, backoff_factor=1.5, use_cache=NBA_CACHE, cache_seconds=12 * 3600)
+
+T = TypeVar("T")
 
 
 def with_retries(label: str, operation: Callable[[], T]) -> T:
@@ -189,8 +97,6 @@ def fetch_player_positions() -> Dict[int, str]:
     """
     print("📋 Fetching player positions from PlayerIndex...")
     
-    time.sleep(0.6)  # Rate limiting
-    
     try:
         player_index = with_retries(
             "PlayerIndex",
@@ -198,11 +104,7 @@ def fetch_player_positions() -> Dict[int, str]:
         )
         df = player_index.get_data_frames()[0]
         
-        positions = {}
-        for _, row in df.iterrows():
-            player_id = int(row["PERSON_ID"])
-            position = row.get("POSITION", "")
-            positions[player_id] = position
+        positions = dict(zip(df["PERSON_ID"].astype(int).tolist(), df["POSITION"].tolist()))
         
         print(f"✅ Got positions for {len(positions)} players")
         return positions
@@ -211,20 +113,19 @@ def fetch_player_positions() -> Dict[int, str]:
         return {}
 
 
-def fetch_all_players() -> List[Dict]:
+def fetch_all_players(top_k: Optional[int] = None) -> List[Dict]:
     """
     Fetch ALL active NBA players using LeagueDashPlayerStats
     Single API call - very efficient (~0.5s for 500+ players)
     Now also fetches real positions from PlayerIndex
+    Players come back in PPG order; with top_k only the top_k scorers are
+    built and returned, and the on-disk cache (full roster only) is left alone.
     """
     print(f"🏀 Fetching all players for {CURRENT_SEASON} season...")
     
     # First fetch real positions from PlayerIndex
     position_map = fetch_player_positions()
     
-    # Add delay to avoid rate limiting
-    time.sleep(0.6)
-    
     # Fetch all player stats for current season
     league_stats = with_retries(
         "LeagueDashPlayerStats",
@@ -236,72 +137,95 @@ def fetch_all_players() -> List[Dict]:
         ),
     )
     
-    df = league_stats.get_data_frames()[0]
-    print(f"📊 Retrieved {len(df)} players from NBA API")
-    
+    # Read the raw resultSets JSON; nba_api's DataFrame would only be converted back
+    result = league_stats.get_dict()["resultSets"][0]
+    headers, rows = result["headers"], result["rowSet"]
+    print(f"📊 Retrieved {len(rows)} players from NBA API")
+    
+    column_index = {name: i for i, name in enumerate(headers)}
+    table = np.array(rows, dtype=object).reshape(len(rows), len(headers))
+
+    # Numeric stats coerced in one pass: missing values and absent columns become 0
+    numeric = np.zeros((len(rows), len(STAT_COLUMNS)))
+    for j, name in enumerate(STAT_COLUMNS):
+        if name in column_index:
+            numeric[:, j] = table[:, column_index[name]].astype(np.float64)
+    column = dict(zip(STAT_COLUMNS, np.nan_to_num(numeric, nan=0.0).T))
+
+    def raw_column(name: str, default) -> List:
+        """Column values as a list, default for missing values or an absent column"""
+        if name not in column_index:
+            return [default] * len(rows)
+        return [default if v is None else v for v in table[:, column_index[name]].tolist()]
+
+    pts, reb, ast, stl, blk, fg_pct = (column[c] for c in ("PTS", "REB", "AST", "STL", "BLK", "FG_PCT"))
+
+    # Calculate rating
+    # (clipped values are positive, so the integer cast truncates like int())
+    rating = np.clip(
+        50 + pts * 1.5 + reb * 0.8 + ast * 1.2 + stl * 2 + blk * 2 + fg_pct * 20, 60, 99
+    ).astype(np.int16).tolist()
+
+    # Rounded season stats, one list per field
+    season_columns = {
+        "mpg": column["MIN"],
+        "pts": pts,
+        "reb": reb,
+        "ast": ast,
+        "stl": stl,
+        "blk": blk,
+        "fg_pct": np.where(fg_pct < 1, fg_pct * 100, fg_pct),
+        "fg3_pct": column["FG3_PCT"] * 100,
+        "ft_pct": column["FT_PCT"] * 100,
+        "fga": column["FGA"],
+        "fta": column["FTA"],
+        "fg3a": column["FG3A"],
+        "fg3m": column["FG3M"],
+    }
+    rounded = {key: np.round(values, 1).tolist() for key, values in season_columns.items()}
+
+    player_ids = [int(v) for v in raw_column("PLAYER_ID", 0)]
+    team_id_list = [int(v) for v in raw_column("TEAM_ID", 0)]
+    team_abbrs = [
+        TEAM_ID_TO_ABBR.get(team_id, abbr)
+        for team_id, abbr in zip(team_id_list, raw_column("TEAM_ABBREVIATION", "FA"))
+    ]
+    names = raw_column("PLAYER_NAME", "")
+    gps = column["GP"].astype(int).tolist()
+    # Real positions from PlayerIndex, normalized (stats break G/F ties)
+    positions = normalize_positions(
+        [position_map.get(player_id, "") for player_id in player_ids], pts, reb, ast, blk
+    )
+    updated_at = datetime.now().isoformat()
+
+    # PPG order (on the rounded value, ties keep API order), computed up front so
+    # players are built already sorted and top_k skips building the rest
+    order = np.argsort(-np.asarray(rounded["pts"]), kind="stable")
+    if top_k is not None:
+        order = order[:top_k]
+
     players = []
-    for _, row in df.iterrows():
-        # Calculate rating
-        pts = row.get("PTS", 0) or 0
-        reb = row.get("REB", 0) or 0
-        ast = row.get("AST", 0) or 0
-        stl = row.get("STL", 0) or 0
-        blk = row.get("BLK", 0) or 0
-        fg_pct = row.get("FG_PCT", 0) or 0
-        
-        rating = min(99, max(60, int(
-            50 + pts * 1.5 + reb * 0.8 + ast * 1.2 + stl * 2 + blk * 2 + fg_pct * 20
-        )))
-        
-        # Get player stats for position inference
-        stats = {
-            "pts": pts,
-            "reb": reb,
-            "ast": ast,
-            "stl": stl,
-            "blk": blk,
-        }
-        
-        # Get real position from PlayerIndex, normalize it
-        player_id = int(row["PLAYER_ID"])
-        raw_position = position_map.get(player_id, "")
-        position = normalize_position(raw_position, stats)
-        
-        player = {
-            "player_id": player_id,
-            "full_name": row["PLAYER_NAME"],
-            "team_id": int(row.get("TEAM_ID", 0)),
-            "team_abbreviation": TEAM_ABBR_MAP.get(row.get("TEAM_ID"), row.get("TEAM_ABBREVIATION", "FA")),
+    for i in order.tolist():
+        season_stats = {"season": CURRENT_SEASON, "gp": gps[i]}
+        season_stats.update((key, values[i]) for key, values in rounded.items())
+        season_stats["rating"] = rating[i]
+
+        players.append({
+            "player_id": player_ids[i],
+            "full_name": names[i],
+            "team_id": team_id_list[i],
+            "team_abbreviation": team_abbrs[i],
             "is_active": True,
-            "position": position,
-            "season_stats": {
-                "season": CURRENT_SEASON,
-                "gp": int(row.get("GP", 0)),
-                "mpg": round(float(row.get("MIN", 0) or 0), 1),
-                "pts": round(float(pts), 1),
-                "reb": round(float(reb), 1),
-                "ast": round(float(ast), 1),
-                "stl": round(float(stl), 1),
-                "blk": round(float(blk), 1),
-                "fg_pct": round(float(fg_pct) * 100, 1) if fg_pct < 1 else round(float(fg_pct), 1),
-                "fg3_pct": round(float(row.get("FG3_PCT", 0) or 0) * 100, 1),
-                "ft_pct": round(float(row.get("FT_PCT", 0) or 0) * 100, 1),
-                "fga": round(float(row.get("FGA", 0) or 0), 1),
-                "fta": round(float(row.get("FTA", 0) or 0), 1),
-                "fg3a": round(float(row.get("FG3A", 0) or 0), 1),
-                "fg3m": round(float(row.get("FG3M", 0) or 0), 1),
-                "rating": rating,
-            },
-            "updated_at": datetime.now().isoformat(),
-        }
-        players.append(player)
-    
-    # Sort by PPG
-    players.sort(key=lambda x: x["season_stats"]["pts"], reverse=True)
+            "position": positions[i],
+            "season_stats": season_stats,
+            "updated_at": updated_at,
+        })
+
+    if top_k is not None:
+        return players
 
     CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(players, f, indent=2)
+    CACHE_PATH.write_bytes(orjson.dumps(players, option=orjson.OPT_INDENT_2))
     print(f"📦 Cached {len(players)} players to {CACHE_PATH}")
     
     return players
@@ -317,8 +241,7 @@ def load_cached_players() -> List[Dict]:
         return []
     
     try:
-        with open(CACHE_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = orjson.loads(CACHE_PATH.read_bytes())
         
         # Handle old cache format: {"timestamp": "...", "season": "...", "count": 521, "players": [...]}
         if isinstance(data, dict) and "players" in data:
@@ -339,34 +262,54 @@ def load_cached_players() -> List[Dict]:
         return []
 
 
+async def upsert_players(players: List[Dict]) -> int:
+    """
+    Upsert players into cached_players in SUPABASE_UPSERT_BATCH_SIZE batches,
+    with up to SUPABASE_UPSERT_CONCURRENCY requests in flight. Returns the
+    number of rows synced; the first failing batch raises.
+    """
+    supabase: AsyncClient = await acreate_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    semaphore = asyncio.Semaphore(SUPABASE_UPSERT_CONCURRENCY)
+    success_count = 0
+    
+    async def upsert_batch(batch: List[Dict]):
+        nonlocal success_count
+        async with semaphore:
+            await supabase.table("cached_players").upsert(batch).execute()
+        success_count += len(batch)
+        print(f"  ✅ Synced {success_count}/{len(players)} players...")
+    
+    tasks = [
+        asyncio.ensure_future(upsert_batch(players[i:i + SUPABASE_UPSERT_BATCH_SIZE]))
+        for i in range(0, len(players), SUPABASE_UPSERT_BATCH_SIZE)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # After a failure, stop the remaining batches before the client goes away,
+        # then close its PostgREST (httpx) session so no connections are left open
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await supabase.postgrest.aclose()
+    return success_count
+
+
 def sync_to_supabase(players: List[Dict]):
     """Sync player data to Supabase cached_players table"""
     if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
         print("⚠️  Supabase credentials not found in .env")
         print("   Required: SUPABASE_URL and SUPABASE_SERVICE_KEY (or SUPABASE_KEY)")
         # Save to local JSON for testing
-        with open("players_backup.json", "w") as f:
-            json.dump(players, f, indent=2)
+        with open("players_backup.json", "wb") as f:
+            f.write(orjson.dumps(players, option=orjson.OPT_INDENT_2))
         print(f"📁 Saved {len(players)} players to players_backup.json")
         return False
     
     print(f"📤 Syncing {len(players)} players to Supabase...")
     
     try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-        
-        # Batch upsert in chunks of 100
-        batch_size = 100
-        success_count = 0
-        
-        for i in range(0, len(players), batch_size):
-            batch = players[i:i + batch_size]
-            
-            # Upsert batch
-            result = supabase.table("cached_players").upsert(batch).execute()
-            success_count += len(batch)
-            
-            print(f"  ✅ Synced {success_count}/{len(players)} players...")
+        success_count = asyncio.run(upsert_players(players))
         
         print(f"\n🎉 Successfully synced {success_count} players to Supabase!")
         return True
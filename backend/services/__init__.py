@@ -1,15 +1,30 @@
 """
 Services package
+
+The nba_service names below are re-exported lazily: importing nba_service
+installs the shared NBA API session, which scripts that only need a pure
+helper module (e.g. services.positions) should not pay for.
 """
 
-from .nba_service import (
-    get_all_players,
-    get_players_by_team,
-    get_players_by_position,
-    get_top_players,
-    get_role_players,
-    get_stars,
-    search_players,
-    NBA_TEAMS,
-    CURRENT_SEASON,
+_NBA_SERVICE_EXPORTS = (
+    "get_all_players",
+    "get_player_by_id",
+    "get_players_filtered",
+    "get_players_by_team",
+    "get_players_by_position",
+    "get_top_players",
+    "get_role_players",
+    "get_stars",
+    "search_players",
+    "NBA_TEAMS",
+    "CURRENT_SEASON",
 )
+
+__all__ = list(_NBA_SERVICE_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _NBA_SERVICE_EXPORTS:
+        from . import nba_service
+        return getattr(nba_service, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,49 @@
+"""
+HTTP caching helpers - ETag / If-None-Match handling for read-mostly endpoints
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def etag_for(body: bytes) -> str:
+    """Short content hash suitable for an ETag value"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header already names this etag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    strong = etag.removeprefix("W/")
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or strong in tags or f"W/{strong}" in tags
+
+
+def cache_headers(etag: str, max_age: int = 3600) -> dict:
+    """ETag + Cache-Control headers for a publicly cacheable response"""
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    media_type: str = "application/json",
+    max_age: int = 3600,
+) -> Response:
+    """
+    Return body with ETag and Cache-Control headers, or an empty 304 when the
+    client already holds this version. etag defaults to a hash of body and
+    should be passed quoted (optionally W/-prefixed) when given explicitly.
+    """
+    if etag is None:
+        etag = f'"{etag_for(body)}"'
+    headers = cache_headers(etag, max_age)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
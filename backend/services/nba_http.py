@@ -0,0 +1,179 @@
+"""
+NBA API HTTP session - one shared session for every nba_api stats call.
+
+Responses are cached on disk with requests-cache (when installed) so repeat
+lookups survive restarts and are shared by all uvicorn workers, and the
+stats.nba.com rate limit is enforced at the transport layer so only requests
+that actually hit the network wait for it.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import requests_cache
+    HAS_REQUESTS_CACHE = True
+except ImportError:
+    HAS_REQUESTS_CACHE = False
+
+NBA_HTTP_CACHE_PATH = Path(__file__).parent.parent / "cache" / "nba_http_cache"
+NBA_HTTP_CACHE_SECONDS = int(os.getenv("NBA_HTTP_CACHE_SECONDS", str(24 * 3600)))
+
+# Minimum spacing between real requests to stats.nba.com, shared by every
+# thread and coroutine using the session (0.6s ~= 1.7 requests/second)
+NBA_API_MIN_INTERVAL = float(os.getenv("NBA_API_MIN_INTERVAL", "0.6"))
+# Requests that may go out back to back after the session has been idle; the
+# long-run rate is still one per NBA_API_MIN_INTERVAL (a token bucket)
+NBA_API_BURST = max(1, int(os.getenv("NBA_API_BURST", "3")))
+# Pause before retrying a request that timed out on a fresh session
+NBA_API_RETRY_BACKOFF = 2.0
+# Keep-alive connections kept per host; sized for a burst of concurrent requests
+NBA_API_POOL_SIZE = 16
+# Sent with every request on top of nba_api's own per-request headers;
+# stats.nba.com is much less likely to stall requests that look like nba.com's
+NBA_STATS_SESSION_HEADERS = {
+    "Origin": "https://www.nba.com",
+    "x-nba-stats-origin": "stats",
+    "x-nba-stats-token": "true",
+}
+
+
+# Per-thread flag set by fetch_nba_endpoint(force_refresh=True): nba_api makes
+# its request on the calling thread, so the flag reaches exactly that request
+# (unlike CachedSession.cache_disabled(), which flips the whole shared session)
+_request_flags = threading.local()
+
+
+@contextmanager
+def _force_refresh_scope(force_refresh: bool):
+    previous = getattr(_request_flags, "force_refresh", False)
+    _request_flags.force_refresh = force_refresh or previous
+    try:
+        yield
+    finally:
+        _request_flags.force_refresh = previous
+
+
+if HAS_REQUESTS_CACHE:
+    class NBACachedSession(requests_cache.CachedSession):
+        """CachedSession that skips the cached copy for force-refresh lookups"""
+
+        def send(self, request, **kwargs):
+            if getattr(_request_flags, "force_refresh", False):
+                # Fetch from the network and store the result as the fresh copy
+                kwargs["force_refresh"] = True
+            return super().send(request, **kwargs)
+
+
+def _nba_retry(total: int, backoff_factor: float) -> Retry:
+    """
+    Transient 429/5xx responses and connection failures are retried with
+    backoff (honoring Retry-After). Read timeouts are not retried here; they
+    surface to fetch_nba_endpoint, which retries on a fresh session.
+    """
+    return Retry(
+        total=total,
+        read=False,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that rate-limits network sends to one per NBA_API_MIN_INTERVAL
+    seconds, allowing up to NBA_API_BURST at once after an idle period
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._next_send = 0.0
+
+    def send(self, request, *args, **kwargs):
+        with self._lock:
+            now = time.monotonic()
+            # Idle time banks up to NBA_API_BURST - 1 sends that need not wait
+            send_at = max(self._next_send, now - (NBA_API_BURST - 1) * NBA_API_MIN_INTERVAL)
+            wait = send_at - now
+            self._next_send = send_at + NBA_API_MIN_INTERVAL
+        if wait > 0:
+            time.sleep(wait)
+        return super().send(request, *args, **kwargs)
+
+
+def create_nba_session(
+    pool_size: int = NBA_API_POOL_SIZE,
+    max_retries: int = 3,
+    backoff_factor: float = 0.8,
+    use_cache: bool = True,
+    cache_seconds: int = NBA_HTTP_CACHE_SECONDS,
+) -> requests.Session:
+    """
+    Build the shared nba_api session: disk-cached if requests-cache is
+    installed (and use_cache), always throttled, retrying, and sending the
+    nba.com browser headers.
+    """
+    if use_cache and HAS_REQUESTS_CACHE:
+        NBA_HTTP_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        session = NBACachedSession(
+            str(NBA_HTTP_CACHE_PATH),
+            backend="sqlite",
+            expire_after=cache_seconds,
+            stale_if_error=True,
+        )
+    else:
+        session = requests.Session()
+    session.headers.update(NBA_STATS_SESSION_HEADERS)
+    # Cache hits are answered before the adapter is reached, so they never wait.
+    session.mount("https://", ThrottledAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=_nba_retry(max_retries, backoff_factor),
+    ))
+    return session
+
+
+# create_nba_session options of the installed session, reused when it is replaced
+_session_options: dict = {}
+
+
+def install_nba_session(**options) -> bool:
+    """
+    Point nba_api's stats endpoints at a new shared session built with
+    create_nba_session(**options). False if nba_api is missing.
+    """
+    try:
+        from nba_api.stats.library.http import NBAStatsHTTP
+    except ImportError:
+        return False
+    NBAStatsHTTP.set_session(create_nba_session(**options))
+    _session_options.clear()
+    _session_options.update(options)
+    return True
+
+
+def fetch_nba_endpoint(endpoint_cls, force_refresh: bool = False, **kwargs):
+    """
+    Instantiate an nba_api endpoint (which performs the request). stats.nba.com
+    tends to hang on a connection it has gone cold on, so a read timeout
+    replaces the shared session and retries once after a short backoff.
+    force_refresh skips the disk cache and stores the new response in it.
+    """
+    with _force_refresh_scope(force_refresh):
+        try:
+            return endpoint_cls(**kwargs)
+        except requests.exceptions.ReadTimeout:
+            print(f"⚠️ {endpoint_cls.__name__} timed out, retrying on a fresh session...")
+            time.sleep(NBA_API_RETRY_BACKOFF)
+            install_nba_session(**_session_options)
+            return endpoint_cls(**kwargs)
@@ -4,14 +4,44 @@ Uses LeagueDashPlayerStats for all player stats in one call
 Supports Supabase caching for production
 """
 
-import json
+import heapq
+import logging
 import os
-from typing import Optional, List, Dict
+import random
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate, repeat
+from typing import Optional, List, Dict, NamedTuple, Tuple
 from datetime import datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
 
-# Supabase client (lazy initialization)
+import numpy as np
+import orjson
+
+try:
+    from nba_api.stats.endpoints import LeagueDashPlayerStats, PlayerCareerStats, PlayerIndex
+    HAS_NBA_API = True
+except ImportError:
+    HAS_NBA_API = False
+
+from .nba_http import fetch_nba_endpoint, install_nba_session
+from .positions import TEAM_ID_TO_ABBR, normalize_positions
+
+logger = logging.getLogger(__name__)
+
+# Route every nba_api stats call through the shared disk-cached, rate-limited session
+install_nba_session()
+
+# Supabase client (lazy initialization). One client is shared by every caller,
+# so its PostgREST HTTP session keeps connections alive between queries.
 _supabase_client = None
+_supabase_client_lock = threading.Lock()
+# Seconds before a PostgREST request gives up, so a slow Supabase falls through
+# to the local cache instead of holding requests open
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
 
 def get_supabase_client():
     """Get or create Supabase client (lazy initialization)"""
@@ -20,16 +50,27 @@ def get_supabase_client():
         url = os.getenv("SUPABASE_URL")
         key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
         if url and key:
-            try:
-                from supabase import create_client
-                _supabase_client = create_client(url, key)
-                print("✅ Supabase client initialized")
-            except Exception as e:
-                print(f"⚠️ Failed to initialize Supabase: {e}")
-                _supabase_client = None
+            with _supabase_client_lock:
+                if _supabase_client is not None:
+                    return _supabase_client
+                try:
+                    from supabase import ClientOptions, create_client
+                    _supabase_client = create_client(
+                        url, key, options=ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT)
+                    )
+                    logger.info("✅ Supabase client initialized")
+                except Exception as e:
+                    logger.warning("⚠️ Failed to initialize Supabase: %s", e)
+                    _supabase_client = None
     return _supabase_client
 
 
+# cached_players columns the API uses, and rows fetched per request (PostgREST
+# caps a single response at 1000 rows by default)
+SUPABASE_PLAYER_COLUMNS = "player_id,full_name,team_abbreviation,position,season_stats"
+SUPABASE_PAGE_SIZE = 1000
+
+
 def get_players_from_supabase() -> Optional[List[Dict]]:
     """
     Fetch all players from Supabase cached_players table.
@@ -40,12 +81,24 @@ def get_players_from_supabase() -> Optional[List[Dict]]:
         return None
     
     try:
-        # Fetch all players from cached_players table
-        result = client.table("cached_players").select("*").execute()
-        
-        if result.data:
+        # Fetch all players from cached_players table, a page at a time so a
+        # table past the response row cap isn't silently truncated
+        rows = []
+        while True:
+            result = (
+                client.table("cached_players")
+                .select(SUPABASE_PLAYER_COLUMNS)
+                .order("player_id")
+                .range(len(rows), len(rows) + SUPABASE_PAGE_SIZE - 1)
+                .execute()
+            )
+            rows.extend(result.data or [])
+            if len(result.data or []) < SUPABASE_PAGE_SIZE:
+                break
+        
+        if rows:
             players = []
-            for row in result.data:
+            for row in rows:
                 # Convert Supabase row to our player format
                 stats = row.get("season_stats", {})
                 player = {
@@ -69,13 +122,13 @@ def get_players_from_supabase() -> Optional[List[Dict]]:
                 players.append(player)
             
             # Sort by PPG
-            players.sort(key=lambda x: x["pts"], reverse=True)
-            print(f"📦 Loaded {len(players)} players from Supabase")
+            players.sort(key=itemgetter("pts"), reverse=True)
+            logger.info("📦 Loaded %s players from Supabase", len(players))
             return players
         
         return None
     except Exception as e:
-        print(f"⚠️ Supabase fetch error: {e}")
+        logger.warning("⚠️ Supabase fetch error: %s", e)
         return None
 
 
@@ -100,14 +153,18 @@ def get_journey_players_from_supabase() -> Optional[List[Dict]]:
                     "teams": row.get("teams", []),
                     "current_team": row.get("current_team", "FA"),
                 })
-            print(f"📦 Loaded {len(players)} journey players from Supabase")
+            logger.info("📦 Loaded %s journey players from Supabase", len(players))
             return players
         return None
     except Exception as e:
-        print(f"⚠️ Supabase journey fetch error: {e}")
+        logger.warning("⚠️ Supabase journey fetch error: %s", e)
         return None
 
 
+# Rows per journey_players upsert request
+JOURNEY_UPSERT_BATCH_SIZE = 500
+
+
 def save_journey_players_to_supabase(players: List[Dict]) -> bool:
     """
     Save journey players to Supabase journey_players table.
@@ -116,31 +173,42 @@ def save_journey_players_to_supabase(players: List[Dict]) -> bool:
     if not client or not players:
         return False
     
-    try:
-        # Prepare data for upsert
-        rows = []
-        for p in players:
-            rows.append({
-                "player_id": p["id"],
-                "player_name": p["name"],
-                "teams": p.get("teams", []),
-                "current_team": p.get("current_team", "FA"),
-                "updated_at": datetime.now().isoformat(),
-            })
-        
-        # Upsert to Supabase
-        result = client.table("journey_players").upsert(rows, on_conflict="player_id").execute()
-        print(f"✅ Saved {len(rows)} journey players to Supabase")
-        return True
-    except Exception as e:
-        print(f"⚠️ Supabase journey save error: {e}")
-        return False
+    # Prepare data for upsert
+    updated_at = datetime.now().isoformat()
+    rows = [
+        {
+            "player_id": p["id"],
+            "player_name": p["name"],
+            "teams": p.get("teams", []),
+            "current_team": p.get("current_team", "FA"),
+            "updated_at": updated_at,
+        }
+        for p in players
+    ]
+    
+    # Upsert in batches so a large save stays under the request size limit and
+    # one failing batch doesn't lose the others
+    saved = 0
+    for i in range(0, len(rows), JOURNEY_UPSERT_BATCH_SIZE):
+        batch = rows[i:i + JOURNEY_UPSERT_BATCH_SIZE]
+        try:
+            client.table("journey_players").upsert(batch, on_conflict="player_id").execute()
+            saved += len(batch)
+        except Exception as e:
+            logger.warning("⚠️ Supabase journey save error (rows %s-%s): %s", i, i + len(batch) - 1, e)
+    
+    if saved:
+        logger.info("✅ Saved %s journey players to Supabase", saved)
+    return saved == len(rows)
 
 
 # Cache configuration (fallback for local development)
 CACHE_DIR = Path(__file__).parent.parent / "cache"
 CACHE_FILE = CACHE_DIR / "nba_players_2025_26.json"
 CACHE_DURATION_HOURS = 24  # Refresh data every 24 hours
+# PlayerIndex positions barely change within a season
+POSITIONS_CACHE_FILE = CACHE_DIR / "positions_2025_26.json"
+POSITIONS_CACHE_DURATION_HOURS = 24 * 7
 
 # Current season
 CURRENT_SEASON = "2025-26"
@@ -151,17 +219,26 @@ def get_cached_players() -> Optional[List[Dict]]:
         if not CACHE_FILE.exists():
             return None
         
-        with open(CACHE_FILE, "r") as f:
-            data = json.load(f)
-        
-        # Check if cache is still valid
-        cached_time = datetime.fromisoformat(data.get("timestamp", "2000-01-01"))
-        if datetime.now() - cached_time > timedelta(hours=CACHE_DURATION_HOURS):
+        # The file is written once per refresh, so a stale mtime means stale
+        # contents - skip reading and parsing it
+        if time.time() - CACHE_FILE.stat().st_mtime > CACHE_DURATION_HOURS * 3600:
             return None
         
+        data = orjson.loads(CACHE_FILE.read_bytes())
+        
+        # Check if cache is still valid (files written before unix_ts existed
+        # only carry the ISO timestamp)
+        if "unix_ts" in data:
+            if time.time() - data["unix_ts"] > CACHE_DURATION_HOURS * 3600:
+                return None
+        else:
+            cached_time = datetime.fromisoformat(data.get("timestamp", "2000-01-01"))
+            if datetime.now() - cached_time > timedelta(hours=CACHE_DURATION_HOURS):
+                return None
+        
         return data.get("players", [])
     except Exception as e:
-        print(f"Cache read error: {e}")
+        logger.warning("Cache read error: %s", e)
         return None
 
 
@@ -171,236 +248,214 @@ def save_to_cache(players: List[Dict]) -> None:
         CACHE_DIR.mkdir(parents=True, exist_ok=True)
         
         data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now().isoformat(),  # for humans; freshness uses unix_ts
+            "unix_ts": time.time(),
             "season": CURRENT_SEASON,
             "count": len(players),
             "players": players
         }
         
-        with open(CACHE_FILE, "w") as f:
-            json.dump(data, f, indent=2)
+        # Write a sibling temp file and rename it over the cache, so a crash
+        # mid-write never leaves a truncated cache behind
+        tmp_file = CACHE_FILE.with_suffix(".tmp")
+        tmp_file.write_bytes(orjson.dumps(data))
+        os.replace(tmp_file, CACHE_FILE)
         
-        print(f"✅ Cached {len(players)} players")
+        logger.info("✅ Cached %s players", len(players))
     except Exception as e:
-        print(f"Cache write error: {e}")
+        logger.warning("Cache write error: %s", e)
 
 
-def fetch_all_players_live() -> List[Dict]:
+def fetch_all_players_live(force_refresh: bool = False) -> List[Dict]:
     """
     Fetch ALL active NBA players for 2025-26 season using LeagueDashPlayerStats
     This is the most efficient way - 1 API call for ~450 players
-    Now also fetches real positions from PlayerIndex
+    Now also fetches real positions from PlayerIndex (cached on disk for a week
+    unless force_refresh)
     """
+    if not HAS_NBA_API:
+        logger.error("❌ nba_api not installed. Run: pip install nba_api")
+        return []
     try:
-        from nba_api.stats.endpoints import LeagueDashPlayerStats, PlayerIndex
-        from nba_api.stats.static import players as static_players
-        import time
-        
-        print(f"🏀 Fetching all players for {CURRENT_SEASON} season...")
-        
-        # First fetch real positions from PlayerIndex
-        position_map = fetch_player_positions()
-        
-        # Add delay to avoid rate limiting
-        time.sleep(0.6)
+        logger.info("🏀 Fetching all players for %s season...", CURRENT_SEASON)
         
-        # Fetch all player stats for current season
-        # PerMode: PerGame gives us per-game averages
-        league_stats = LeagueDashPlayerStats(
-            season=CURRENT_SEASON,
-            per_mode_detailed="PerGame",
-            season_type_all_star="Regular Season"
-        )
-        
-        # Get the data
-        df = league_stats.get_data_frames()[0]
-        
-        print(f"📊 Retrieved {len(df)} players from NBA API")
-        
-        # Map team IDs to abbreviations
-        team_abbr_map = {
-            1610612737: "ATL", 1610612738: "BOS", 1610612739: "CLE",
-            1610612740: "NOP", 1610612741: "CHI", 1610612742: "DAL",
-            1610612743: "DEN", 1610612744: "GSW", 1610612745: "HOU",
-            1610612746: "LAC", 1610612747: "LAL", 1610612748: "MIA",
-            1610612749: "MIL", 1610612750: "MIN", 1610612751: "BKN",
-            1610612752: "NYK", 1610612753: "ORL", 1610612754: "IND",
-            1610612755: "PHI", 1610612756: "PHX", 1610612757: "POR",
-            1610612758: "SAC", 1610612759: "SAS", 1610612760: "OKC",
-            1610612761: "TOR", 1610612762: "UTA", 1610612763: "MEM",
-            1610612764: "WAS", 1610612765: "DET", 1610612766: "CHA",
-        }
-        
-        players = []
-        for _, row in df.iterrows():
-            # Calculate a simple rating based on stats (0-99 scale)
-            pts = row.get("PTS", 0) or 0
-            reb = row.get("REB", 0) or 0
-            ast = row.get("AST", 0) or 0
-            stl = row.get("STL", 0) or 0
-            blk = row.get("BLK", 0) or 0
-            fg_pct = row.get("FG_PCT", 0) or 0
-            
-            # Simple rating formula
-            rating = min(99, max(60, int(
-                50 + pts * 1.5 + reb * 0.8 + ast * 1.2 + stl * 2 + blk * 2 + fg_pct * 20
-            )))
-            
-            # Get player stats for position inference
-            stats = {"pts": pts, "reb": reb, "ast": ast, "stl": stl, "blk": blk}
+        # Real positions from PlayerIndex are fetched on a worker thread while
+        # the stats request runs, so the two round trips overlap (the shared
+        # session still spaces their sends NBA_API_MIN_INTERVAL apart)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            positions_future = executor.submit(fetch_player_positions, force_refresh)
             
-            # Get real position from PlayerIndex, normalize it
-            player_id = int(row["PLAYER_ID"])
-            raw_position = position_map.get(player_id, "")
-            position = normalize_position(raw_position, stats)
+            # Fetch all player stats for current season
+            # PerMode: PerGame gives us per-game averages
+            league_stats = fetch_nba_endpoint(
+                LeagueDashPlayerStats,
+                season=CURRENT_SEASON,
+                per_mode_detailed="PerGame",
+                season_type_all_star="Regular Season",
+                force_refresh=force_refresh,
+            )
             
-            player = {
-                "id": player_id,
-                "name": row["PLAYER_NAME"],
-                "team": team_abbr_map.get(row.get("TEAM_ID"), row.get("TEAM_ABBREVIATION", "FA")),
-                "position": position,
-                "age": int(row.get("AGE", 0)) if row.get("AGE") else None,
-                "gp": int(row.get("GP", 0)),
-                "mpg": round(float(row.get("MIN", 0) or 0), 1),
-                "pts": round(float(pts), 1),
-                "reb": round(float(reb), 1),
-                "ast": round(float(ast), 1),
-                "stl": round(float(stl), 1),
-                "blk": round(float(blk), 1),
-                "fg_pct": round(float(fg_pct) * 100, 1) if fg_pct < 1 else round(float(fg_pct), 1),
-                "fg3_pct": round(float(row.get("FG3_PCT", 0) or 0) * 100, 1),
-                "ft_pct": round(float(row.get("FT_PCT", 0) or 0) * 100, 1),
-                "rating": rating,
-                "season": CURRENT_SEASON,
-            }
-            players.append(player)
+            # Get the data
+            df = league_stats.get_data_frames()[0]
+            position_map = positions_future.result()
         
-        # Sort by points per game (descending)
-        players.sort(key=lambda x: x["pts"], reverse=True)
+        logger.info("📊 Retrieved %s players from NBA API", len(df))
         
-        # Cache the results
+        players = _build_players(df, position_map)
+        
+        # Cache the results; the next get_all_players() reloads instead of
+        # serving its in-memory copy
         save_to_cache(players)
+        invalidate_players_cache()
         
         return players
         
-    except ImportError:
-        print("❌ nba_api not installed. Run: pip install nba_api")
-        return []
     except Exception as e:
-        print(f"❌ Error fetching NBA data: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error fetching NBA data: %s", e)
         return []
 
 
-def fetch_player_positions() -> Dict[int, str]:
+def _build_players(df, position_map: Dict[int, str]) -> List[Dict]:
     """
-    Fetch real position data from PlayerIndex endpoint.
-    Returns a dict mapping player_id -> position
+    Player dicts (sorted by PPG) from a LeagueDashPlayerStats frame, using
+    whole-column arithmetic instead of per-row pandas access
     """
+    n = len(df)
+
+    def column(name: str) -> np.ndarray:
+        """Numeric column as float64 with missing values as 0 (absent columns are all 0)"""
+        if name not in df:
+            return np.zeros(n)
+        return df[name].fillna(0).to_numpy(dtype=np.float64)
+
+    pts, reb, ast, stl, blk, fg_pct = (column(c) for c in ("PTS", "REB", "AST", "STL", "BLK", "FG_PCT"))
+
+    # Simple rating formula (0-99 scale, floor of 60)
+    # (clipped values are positive, so the integer cast truncates like int())
+    rating = np.clip(
+        50 + pts * 1.5 + reb * 0.8 + ast * 1.2 + stl * 2 + blk * 2 + fg_pct * 20, 60, 99
+    ).astype(np.int16).tolist()
+
+    # Rounded per-game stats, one list per field
+    rounded = {
+        "mpg": column("MIN"),
+        "pts": pts,
+        "reb": reb,
+        "ast": ast,
+        "stl": stl,
+        "blk": blk,
+        "fg_pct": np.where(fg_pct < 1, fg_pct * 100, fg_pct),
+        "fg3_pct": column("FG3_PCT") * 100,
+        "ft_pct": column("FT_PCT") * 100,
+    }
+    rounded = {key: np.round(values, 1).tolist() for key, values in rounded.items()}
+
+    age = column("AGE")
+    ages = np.where(age != 0, age.astype(np.int64), None).tolist()  # unknown age -> None
+    gps = column("GP").astype(np.int64).tolist()
+    player_ids = df["PLAYER_ID"].astype(int).tolist()
+    names = df["PLAYER_NAME"].tolist()
+    # Team from the shared TEAM_ID_TO_ABBR table, falling back to the
+    # API's own abbreviation, then "FA"
+    if "TEAM_ID" in df:
+        teams = df["TEAM_ID"].map(TEAM_ID_TO_ABBR)
+        if "TEAM_ABBREVIATION" in df:
+            teams = teams.fillna(df["TEAM_ABBREVIATION"])
+        teams = teams.fillna("FA").tolist()
+    else:
+        teams = df["TEAM_ABBREVIATION"].fillna("FA").tolist() if "TEAM_ABBREVIATION" in df else ["FA"] * n
+    # Real positions from PlayerIndex, normalized (stats break G/F ties)
+    positions = normalize_positions(
+        [position_map.get(player_id, "") for player_id in player_ids], pts, reb, ast, blk
+    )
+
+    # Column lists in player key order, zipped into one dict per player
+    columns = {
+        "id": player_ids,
+        "name": names,
+        "team": teams,
+        "position": positions,
+        "age": ages,
+        "gp": gps,
+        **rounded,
+        "rating": rating,
+        "season": repeat(CURRENT_SEASON),
+    }
+    keys = tuple(columns)
+    players = [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+    # Sort by points per game (descending)
+    players.sort(key=itemgetter("pts"), reverse=True)
+    return players
+
+
+def get_cached_positions() -> Optional[Dict[int, str]]:
+    """Get the PlayerIndex position map from its cache file if still valid"""
     try:
-        from nba_api.stats.endpoints import PlayerIndex
-        import time
-        
-        print("📋 Fetching player positions from PlayerIndex...")
-        time.sleep(0.6)  # Rate limiting
-        
-        player_index = PlayerIndex(season=CURRENT_SEASON)
-        df = player_index.get_data_frames()[0]
-        
-        positions = {}
-        for _, row in df.iterrows():
-            player_id = int(row["PERSON_ID"])
-            position = row.get("POSITION", "")
-            positions[player_id] = position
+        if not POSITIONS_CACHE_FILE.exists():
+            return None
+        if time.time() - POSITIONS_CACHE_FILE.stat().st_mtime > POSITIONS_CACHE_DURATION_HOURS * 3600:
+            return None
         
-        print(f"✅ Got positions for {len(positions)} players")
-        return positions
+        positions = orjson.loads(POSITIONS_CACHE_FILE.read_bytes())
+        return {int(player_id): position for player_id, position in positions.items()}
     except Exception as e:
-        print(f"⚠️ Error fetching positions: {e}")
-        return {}
+        logger.warning("Positions cache read error: %s", e)
+        return None
 
 
-def normalize_position(pos: str, stats: dict = None) -> str:
+def save_positions_to_cache(positions: Dict[int, str]) -> None:
+    """Save the position map (player ids become JSON string keys)"""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = POSITIONS_CACHE_FILE.with_suffix(".tmp")
+        tmp_file.write_bytes(orjson.dumps(positions, option=orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_file, POSITIONS_CACHE_FILE)
+    except Exception as e:
+        logger.warning("Positions cache write error: %s", e)
+
+
+def _first_result_set(endpoint) -> Tuple[Dict[str, int], List[list]]:
     """
-    Convert NBA API position format to standard 5-position format.
-    NBA API uses: G, F, C, G-F, F-G, C-F, F-C, etc.
-    We want: PG, SG, SF, PF, C
+    (column name -> index, rows) of an nba_api endpoint's first result set,
+    read from the raw JSON; the DataFrame would only be converted back to lists
     """
-    if not pos:
-        return infer_position_from_stats(stats) if stats else "SF"
-    
-    pos = pos.upper().strip()
-    
-    # Direct mappings for single positions
-    if pos == "C":
-        return "C"
-    
-    # For guards, use stats to differentiate PG vs SG
-    if pos == "G":
-        if stats:
-            ast = stats.get("ast", 0) or 0
-            pts = stats.get("pts", 0) or 0
-            if ast > 4 or (ast > 2 and pts < 15):
-                return "PG"
-        return "SG"
-    
-    # For forwards, use stats to differentiate SF vs PF
-    if pos == "F":
-        if stats:
-            reb = stats.get("reb", 0) or 0
-            blk = stats.get("blk", 0) or 0
-            if reb > 6 or blk > 1:
-                return "PF"
-        return "SF"
-    
-    # Combo positions - use first position as primary
-    if "-" in pos:
-        primary, secondary = pos.split("-")
-        
-        if primary == "C":
-            return "C"
-        if primary == "F" and secondary == "C":
-            return "PF"
-        if ("F" in pos and "G" in pos):
-            if stats:
-                ast = stats.get("ast", 0) or 0
-                reb = stats.get("reb", 0) or 0
-                if ast > reb:
-                    return "SG"
-            return "SF"
-        if primary == "G":
-            return "SG"
-        if primary == "F":
-            return "SF"
-    
-    return infer_position_from_stats(stats) if stats else "SF"
+    result = endpoint.get_dict()["resultSets"][0]
+    return {name: i for i, name in enumerate(result["headers"])}, result["rowSet"]
 
 
-def infer_position_from_stats(stats: dict) -> str:
-    """Fallback position inference from stats"""
-    if not stats:
-        return "SF"
-    
-    pts = stats.get("pts", 0) or 0
-    reb = stats.get("reb", 0) or 0
-    ast = stats.get("ast", 0) or 0
-    blk = stats.get("blk", 0) or 0
-    
-    if reb > 8 and blk > 1:
-        return "C"
-    if reb > 10:
-        return "C"
-    if reb > 6:
-        return "PF"
-    if ast > 5:
-        return "PG"
-    if ast > 3 and pts < 18:
-        return "PG"
-    if pts > 15 and reb < 5 and ast < 5:
-        return "SG"
+def fetch_player_positions(force_refresh: bool = False) -> Dict[int, str]:
+    """
+    Fetch real position data from PlayerIndex endpoint.
+    Returns a dict mapping player_id -> position
+    Served from the positions cache file unless it is stale or force_refresh.
+    """
+    if not force_refresh:
+        cached = get_cached_positions()
+        if cached:
+            logger.info("📦 Using cached positions (%s players)", len(cached))
+            return cached
     
-    return "SF"
+    try:
+        logger.info("📋 Fetching player positions from PlayerIndex...")
+        
+        player_index = fetch_nba_endpoint(PlayerIndex, season=CURRENT_SEASON, force_refresh=force_refresh)
+        columns, rows = _first_result_set(player_index)
+        
+        id_i = columns["PERSON_ID"]
+        pos_i = columns.get("POSITION")
+        positions = {
+            int(row[id_i]): (row[pos_i] if pos_i is not None else "")
+            for row in rows
+        }
+        
+        logger.info("✅ Got positions for %s players", len(positions))
+        if positions:
+            save_positions_to_cache(positions)
+        return positions
+    except Exception as e:
+        logger.warning("⚠️ Error fetching positions: %s", e)
+        return {}
 
 
 def get_expired_cache() -> Optional[List[Dict]]:
@@ -409,16 +464,54 @@ def get_expired_cache() -> Optional[List[Dict]]:
         if not CACHE_FILE.exists():
             return None
         
-        with open(CACHE_FILE, "r") as f:
-            data = json.load(f)
+        data = orjson.loads(CACHE_FILE.read_bytes())
         
         return data.get("players", [])
     except Exception as e:
-        print(f"Fallback cache read error: {e}")
+        logger.warning("Fallback cache read error: %s", e)
         return None
 
 
+# In-process copy of the last get_all_players() result: (expires_at, players).
+# Saves a Supabase query or cache file parse on every player lookup.
+PLAYERS_MEMORY_TTL_SECONDS = 3600
+_players_memory: Tuple[float, Optional[List[Dict]]] = (0.0, None)
+# Held while (re)loading, so concurrent requests on FastAPI's thread pool wait
+# for one load instead of each querying Supabase
+_players_memory_lock = threading.Lock()
+
+
 def get_all_players(force_refresh: bool = False) -> List[Dict]:
+    """
+    Get all players, served from memory for PLAYERS_MEMORY_TTL_SECONDS after
+    each successful load. force_refresh bypasses memory and the caches.
+    """
+    global _players_memory
+    if not force_refresh:
+        expires_at, players = _players_memory
+        if players is not None and expires_at > time.monotonic():
+            return players
+    
+    with _players_memory_lock:
+        if not force_refresh:
+            # Another thread may have finished loading while this one waited
+            expires_at, players = _players_memory
+            if players is not None and expires_at > time.monotonic():
+                return players
+        
+        players = _load_all_players(force_refresh)
+        if players:
+            _players_memory = (time.monotonic() + PLAYERS_MEMORY_TTL_SECONDS, players)
+        return players
+
+
+def invalidate_players_cache() -> None:
+    """Drop the in-memory player list so the next get_all_players() reloads it"""
+    global _players_memory
+    _players_memory = (0.0, None)
+
+
+def _load_all_players(force_refresh: bool = False) -> List[Dict]:
     """
     Get all players with priority:
     1. Supabase (production - synced daily)
@@ -427,79 +520,176 @@ def get_all_players(force_refresh: bool = False) -> List[Dict]:
     4. Expired cache (absolute fallback)
     """
     if not force_refresh:
-        # Priority 1: Try Supabase first (production data source)
-        supabase_players = get_players_from_supabase()
-        if supabase_players:
-            return supabase_players
+        # Priority 1: Try Supabase first (production data source). The local
+        # cache is read alongside it, so a Supabase miss costs no extra wait.
+        if get_supabase_client():
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                cached_future = executor.submit(get_cached_players)
+                supabase_players = get_players_from_supabase()
+                if supabase_players:
+                    return supabase_players
+                cached = cached_future.result()
+        else:
+            cached = get_cached_players()
         
         # Priority 2: Fall back to local cache (development)
-        cached = get_cached_players()
         if cached:
-            print(f"📦 Using local cached data ({len(cached)} players)")
+            logger.info("📦 Using local cached data (%s players)", len(cached))
             return cached
     
     # Priority 3: Fetch fresh data from NBA API
     try:
-        fresh_data = fetch_all_players_live()
+        fresh_data = fetch_all_players_live(force_refresh)
         if fresh_data:
             return fresh_data
     except Exception as e:
-        print(f"⚠️ API fetch failed: {e}")
+        logger.warning("⚠️ API fetch failed: %s", e)
     
     # Priority 4: Fallback to expired cache
     expired_cache = get_expired_cache()
     if expired_cache:
-        print(f"📦 Using expired cache as fallback ({len(expired_cache)} players)")
+        logger.info("📦 Using expired cache as fallback (%s players)", len(expired_cache))
         return expired_cache
     
     # Last resort: return empty list
-    print("❌ No data available - all sources failed")
+    logger.error("❌ No data available - all sources failed")
     return []
 
 
+class PlayerIndexes(NamedTuple):
+    """Lookup indexes over one get_all_players() list"""
+    players: List[Dict]
+    by_id: Dict[int, Dict]
+    by_team: Dict[str, List[Dict]]
+    by_position: Dict[str, List[Dict]]
+    by_rating: List[Dict]  # highest rating first
+    role_players: List[Dict]  # get_role_players criteria, most games first
+    # Lowercased names joined by "\n" (which no name or useful query contains), and
+    # each name's start offset, so a search is a few str.find calls over one string
+    search_text: str
+    search_starts: List[int]
+    # Column arrays for the mask-based filters, aligned with players
+    team_col: np.ndarray
+    position_col: np.ndarray
+    pts_col: np.ndarray
+    gp_col: np.ndarray
+
+
+def _build_player_indexes(all_players: List[Dict]) -> PlayerIndexes:
+    """Build every lookup index over all_players in one go"""
+    by_team: Dict[str, List[Dict]] = {}
+    by_position: Dict[str, List[Dict]] = {}
+    for p in all_players:
+        by_team.setdefault(p["team"], []).append(p)
+        by_position.setdefault(p["position"], []).append(p)
+    names_lower = [p["name"].lower() for p in all_players]
+    return PlayerIndexes(
+        players=all_players,
+        by_id={p["id"]: p for p in all_players},
+        by_team=by_team,
+        by_position=by_position,
+        by_rating=sorted(all_players, key=itemgetter("rating"), reverse=True),
+        # Role players: 8-18 PPG with at least 15 games, most games (recognizable) first
+        role_players=sorted(
+            (p for p in all_players if 8 <= p["pts"] <= 18 and p["gp"] >= 15),
+            key=itemgetter("gp"), reverse=True,
+        ),
+        search_text="\n".join(names_lower),
+        search_starts=list(accumulate((len(name) + 1 for name in names_lower[:-1]), initial=0)),
+        team_col=np.array([p["team"] for p in all_players], dtype=str),
+        position_col=np.array([p["position"] for p in all_players], dtype=str),
+        pts_col=np.array([p["pts"] or 0 for p in all_players], dtype=np.float64),
+        gp_col=np.array([p["gp"] or 0 for p in all_players], dtype=np.float64),
+    )
+
+
+# Indexes over the last list returned by get_all_players(), rebuilt only when
+# that list changes. Swapped in as one object, so a request never mixes indexes
+# from two different lists.
+_player_indexes: Optional[PlayerIndexes] = None
+
+
+def _get_player_indexes(force_refresh: bool = False) -> PlayerIndexes:
+    """Indexes over all players, rebuilt if the player list changed"""
+    global _player_indexes
+    all_players = get_all_players(force_refresh=force_refresh)
+    indexes = _player_indexes
+    if indexes is None or indexes.players is not all_players:
+        indexes = _player_indexes = _build_player_indexes(all_players)
+    return indexes
+
+
+def get_players_filtered(
+    team: Optional[str] = None,
+    position: Optional[str] = None,
+    min_ppg: Optional[float] = None,
+    limit: int = 100,
+    force_refresh: bool = False,
+) -> List[Dict]:
+    """Get up to `limit` players matching all given filters, in PPG order"""
+    indexes = _get_player_indexes(force_refresh)
+    mask = np.ones(len(indexes.players), dtype=bool)
+    if team:
+        mask &= indexes.team_col == team.upper()
+    if position:
+        mask &= indexes.position_col == position.upper()
+    if min_ppg:
+        mask &= indexes.pts_col >= min_ppg
+    return [indexes.players[i] for i in np.flatnonzero(mask)[:limit]]
+
+
+def get_player_by_id(player_id: int) -> Optional[Dict]:
+    """Get a single player by ID"""
+    return _get_player_indexes().by_id.get(player_id)
+
+
 def get_players_by_team(team: str) -> List[Dict]:
     """Get all players from a specific team"""
-    all_players = get_all_players()
-    return [p for p in all_players if p["team"] == team.upper()]
+    return list(_get_player_indexes().by_team.get(team.upper(), ()))
 
 
 def get_players_by_position(position: str) -> List[Dict]:
     """Get all players at a specific position"""
-    all_players = get_all_players()
-    return [p for p in all_players if p["position"] == position.upper()]
+    return list(_get_player_indexes().by_position.get(position.upper(), ()))
 
 
 def get_top_players(count: int = 50) -> List[Dict]:
     """Get top N players by rating"""
-    all_players = get_all_players()
-    sorted_players = sorted(all_players, key=lambda x: x["rating"], reverse=True)
-    return sorted_players[:count]
+    return _get_player_indexes().by_rating[:count]
 
 
 def get_role_players(count: int = 30) -> List[Dict]:
     """Get role players (mid-tier by PPG) for guessing games"""
-    all_players = get_all_players()
-    # Role players: 8-18 PPG range with at least 15 games played
-    role_players = [
-        p for p in all_players 
-        if 8 <= p["pts"] <= 18 and p["gp"] >= 15
-    ]
-    # Sort by games played (more recognizable players)
-    role_players.sort(key=lambda x: x["gp"], reverse=True)
-    return role_players[:count]
+    return _get_player_indexes().role_players[:count]
 
 
-def get_stars(min_ppg: float = 20.0) -> List[Dict]:
-    """Get star players (20+ PPG)"""
-    all_players = get_all_players()
-    return [p for p in all_players if p["pts"] >= min_ppg and p["gp"] >= 10]
+def get_stars(min_ppg: float = 20.0, min_gp: int = 10) -> List[Dict]:
+    """Get star players (20+ PPG, 10+ games by default)"""
+    indexes = _get_player_indexes()
+    mask = (indexes.pts_col >= min_ppg) & (indexes.gp_col >= min_gp)
+    return [indexes.players[i] for i in np.flatnonzero(mask)]
 
 
 def search_players(query: str) -> List[Dict]:
     """Search players by name"""
-    all_players = get_all_players()
+    indexes = _get_player_indexes()
+    all_players, search_text, search_starts = indexes.players, indexes.search_text, indexes.search_starts
     query_lower = query.lower()
-    return [p for p in all_players if query_lower in p["name"].lower()]
+    if not query_lower:
+        return list(all_players)
+    if "\n" in query_lower:
+        return []
+    
+    # Each hit maps back to its name by offset, then the scan resumes at the next name
+    results = []
+    pos = search_text.find(query_lower)
+    while pos != -1:
+        i = bisect_right(search_starts, pos) - 1
+        results.append(all_players[i])
+        if i + 1 == len(search_starts):
+            break
+        pos = search_text.find(query_lower, search_starts[i + 1])
+    return results
 
 
 # Team configurations for draft mode
@@ -537,24 +727,14 @@ NBA_TEAMS = [
 ]
 
 
-# Team ID to abbreviation mapping (includes historical teams)
-TEAM_ID_TO_ABBR = {
-    1610612737: "ATL", 1610612738: "BOS", 1610612739: "CLE",
-    1610612740: "NOP", 1610612741: "CHI", 1610612742: "DAL",
-    1610612743: "DEN", 1610612744: "GSW", 1610612745: "HOU",
-    1610612746: "LAC", 1610612747: "LAL", 1610612748: "MIA",
-    1610612749: "MIL", 1610612750: "MIN", 1610612751: "BKN",
-    1610612752: "NYK", 1610612753: "ORL", 1610612754: "IND",
-    1610612755: "PHI", 1610612756: "PHX", 1610612757: "POR",
-    1610612758: "SAC", 1610612759: "SAS", 1610612760: "OKC",
-    1610612761: "TOR", 1610612762: "UTA", 1610612763: "MEM",
-    1610612764: "WAS", 1610612765: "DET", 1610612766: "CHA",
-    # Historical teams
-    1610612760: "OKC",  # Also was SEA (Seattle SuperSonics)
-    1610612763: "MEM",  # Was VAN (Vancouver Grizzlies)
-    1610612751: "BKN",  # Was NJN (New Jersey Nets)
-    1610612740: "NOP",  # Was NOH/NOK (New Orleans Hornets/Oklahoma City)
-    1610612766: "CHA",  # Was CHH/CHA (Charlotte Bobcats)
+# Abbreviations of relocated/renamed franchises -> current abbreviation
+HISTORICAL_ABBR_TO_CURRENT = {
+    "NJN": "BKN",  # New Jersey Nets
+    "SEA": "OKC",  # Seattle SuperSonics
+    "VAN": "MEM",  # Vancouver Grizzlies
+    "NOH": "NOP",  # New Orleans Hornets
+    "NOK": "NOP",  # New Orleans/Oklahoma City Hornets
+    "CHH": "CHA",  # Charlotte Hornets (original)
 }
 
 
@@ -564,62 +744,88 @@ def get_player_team_history(player_id: int) -> List[str]:
     Returns list of team abbreviations in chronological order.
     """
     try:
-        from nba_api.stats.endpoints import playercareerstats
-        import time
-        
-        time.sleep(0.6)  # Rate limiting
-        
-        career = playercareerstats.PlayerCareerStats(player_id=player_id)
-        df = career.get_data_frames()[0]  # Regular season stats
+        career = fetch_nba_endpoint(PlayerCareerStats, player_id=player_id)
+        columns, rows = _first_result_set(career)  # Regular season stats
         
-        if len(df) == 0:
+        if not rows:
             return []
         
+        team_i = columns.get("TEAM_ID")
+        abbr_i = columns.get("TEAM_ABBREVIATION")
+        
         # Get unique teams in chronological order (by season)
         teams = []
-        for _, row in df.iterrows():
-            team_id = row.get("TEAM_ID")
-            team_abbr = TEAM_ID_TO_ABBR.get(team_id)
-            
+        for row in rows:
+            team_id = row[team_i] if team_i is not None else None
+            fallback_abbr = row[abbr_i] if abbr_i is not None else ""
             # Also try TEAM_ABBREVIATION column
-            if not team_abbr:
-                team_abbr = row.get("TEAM_ABBREVIATION", "")
+            team_abbr = TEAM_ID_TO_ABBR.get(team_id) or fallback_abbr
             
             # Skip "TOT" - this is combined stats when traded mid-season, not a real team
             if team_abbr == "TOT":
                 continue
             
             # Handle historical team names
-            if team_abbr == "NJN":
-                team_abbr = "BKN"
-            elif team_abbr == "SEA":
-                team_abbr = "OKC"
-            elif team_abbr == "VAN":
-                team_abbr = "MEM"
-            elif team_abbr in ["NOH", "NOK"]:
-                team_abbr = "NOP"
-            elif team_abbr == "CHH":
-                team_abbr = "CHA"
-                
+            team_abbr = HISTORICAL_ABBR_TO_CURRENT.get(team_abbr, team_abbr)
+            
             if team_abbr and (not teams or teams[-1] != team_abbr):
                 teams.append(team_abbr)
         
         return teams
         
     except Exception as e:
-        print(f"Error getting team history for player {player_id}: {e}")
+        logger.warning("Error getting team history for player %s: %s", player_id, e)
         return []
 
 
+# Team histories looked up at once when building journey players; the shared
+# session still spaces their network sends NBA_API_MIN_INTERVAL apart
+JOURNEY_FETCH_WORKERS = int(os.getenv("JOURNEY_FETCH_WORKERS", "8"))
+
+# Team counts of candidates that fell short of min_teams, so later rebuilds
+# skip their lookups. The file is started over once it is this old, which
+# picks up players who have since changed teams.
+JOURNEY_SHORT_HISTORIES_FILE = CACHE_DIR / "journey_short_histories.json"
+JOURNEY_SHORT_HISTORIES_DURATION_DAYS = 28
+
+
+def get_journey_short_histories() -> Tuple[float, Dict[int, int]]:
+    """
+    Get (created unix time, player_id -> team count) from the short-history
+    file, or a fresh empty map if it is missing or expired.
+    """
+    now = time.time()
+    try:
+        if JOURNEY_SHORT_HISTORIES_FILE.exists():
+            data = orjson.loads(JOURNEY_SHORT_HISTORIES_FILE.read_bytes())
+            created = data.get("unix_ts", 0)
+            if now - created < JOURNEY_SHORT_HISTORIES_DURATION_DAYS * 86400:
+                return created, {int(player_id): n for player_id, n in data.get("team_counts", {}).items()}
+    except Exception as e:
+        logger.warning("Journey short-history read error: %s", e)
+    return now, {}
+
+
+def save_journey_short_histories(created: float, team_counts: Dict[int, int]) -> None:
+    """Save the short-history map, keeping the time the file was started"""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = JOURNEY_SHORT_HISTORIES_FILE.with_suffix(".tmp")
+        tmp_file.write_bytes(orjson.dumps(
+            {"unix_ts": created, "team_counts": team_counts},
+            option=orjson.OPT_NON_STR_KEYS,
+        ))
+        os.replace(tmp_file, JOURNEY_SHORT_HISTORIES_FILE)
+    except Exception as e:
+        logger.warning("Journey short-history write error: %s", e)
+
+
 def get_journey_players(count: int = 30, min_teams: int = 3) -> List[Dict]:
     """
     Get players with their team history for The Journey game.
     Only returns players who have played for at least min_teams teams.
     Priority: Supabase -> File Cache -> NBA API
     """
-    import random
-    import time
-    
     # 1. Try Supabase first (fastest)
     supabase_players = get_journey_players_from_supabase()
     if supabase_players and len(supabase_players) >= 10:
@@ -633,51 +839,64 @@ def get_journey_players(count: int = 30, min_teams: int = 3) -> List[Dict]:
     
     try:
         if journey_cache_file.exists():
-            with open(journey_cache_file, "r") as f:
-                data = json.load(f)
+            data = orjson.loads(journey_cache_file.read_bytes())
             cached_time = datetime.fromisoformat(data.get("timestamp", "2000-01-01"))
             if datetime.now() - cached_time < timedelta(hours=CACHE_DURATION_HOURS * 7):  # Cache for a week
-                print(f"📦 Using cached journey data ({len(data.get('players', []))} players)")
+                logger.info("📦 Using cached journey data (%s players)", len(data.get('players', [])))
                 players = data.get("players", [])
                 # Filter by min_teams and limit
                 filtered = [p for p in players if len(p.get("teams", [])) >= min_teams]
                 random.shuffle(filtered)
                 return filtered[:count]
     except Exception as e:
-        print(f"Journey cache read error: {e}")
+        logger.warning("Journey cache read error: %s", e)
     
     # 3. Fall back to NBA API (slowest - only when no cache available)
-    print(f"🏀 Fetching journey players from NBA API...")
+    logger.info("🏀 Fetching journey players from NBA API...")
     
     # Get list of notable players to check (veterans with long careers)
     all_players = get_all_players()
     
     journey_players = []
     
-    # Sort by games played to prioritize veterans
-    sorted_players = sorted(all_players, key=lambda x: x.get("gp", 0), reverse=True)
+    # Check top 100 by games played to prioritize veterans, minus players a
+    # recent rebuild already found with too few teams
+    candidates = heapq.nlargest(100, all_players, key=lambda x: x.get("gp", 0))
+    short_created, short_histories = get_journey_short_histories()
+    known_short_histories = dict(short_histories)
+    candidates = [p for p in candidates if short_histories.get(p["id"], min_teams) >= min_teams]
     
-    for player in sorted_players[:100]:  # Check top 100 by games played
-        player_id = player["id"]
-        player_name = player["name"]
-        
-        print(f"  Checking {player_name}...")
-        
-        team_history = get_player_team_history(player_id)
-        
-        if len(team_history) >= min_teams:
-            journey_players.append({
-                "id": player_id,
-                "name": player_name,
-                "teams": team_history,
-                "current_team": player.get("team", team_history[-1] if team_history else "FA"),
-            })
-            print(f"    ✅ {player_name}: {' -> '.join(team_history)}")
-        
-        if len(journey_players) >= count * 2:  # Get double what we need
-            break
-        
-        time.sleep(0.3)  # Additional rate limiting
+    # Histories are fetched concurrently but consumed in order, so the result
+    # matches a serial scan; lookups not yet started are cancelled once enough
+    # players are found
+    executor = ThreadPoolExecutor(max_workers=JOURNEY_FETCH_WORKERS)
+    try:
+        histories = executor.map(get_player_team_history, [player["id"] for player in candidates])
+        for player, team_history in zip(candidates, histories):
+            player_name = player["name"]
+            
+            logger.info("  Checking %s...", player_name)
+            
+            if len(team_history) >= min_teams:
+                journey_players.append({
+                    "id": player["id"],
+                    "name": player_name,
+                    "teams": team_history,
+                    "current_team": player.get("team", team_history[-1] if team_history else "FA"),
+                })
+                logger.info("    ✅ %s: %s", player_name, ' -> '.join(team_history))
+                short_histories.pop(player["id"], None)
+            elif team_history:
+                # An empty history is usually a failed lookup, so it isn't recorded
+                short_histories[player["id"]] = len(team_history)
+            
+            if len(journey_players) >= count * 2:  # Get double what we need
+                break
+    finally:
+        executor.shutdown(cancel_futures=True)
+    
+    if short_histories != known_short_histories:
+        save_journey_short_histories(short_created, short_histories)
     
     # Save to both file cache and Supabase
     try:
@@ -686,11 +905,10 @@ def get_journey_players(count: int = 30, min_teams: int = 3) -> List[Dict]:
             "timestamp": datetime.now().isoformat(),
             "players": journey_players
         }
-        with open(journey_cache_file, "w") as f:
-            json.dump(cache_data, f, indent=2)
-        print(f"✅ Cached {len(journey_players)} journey players to file")
+        journey_cache_file.write_bytes(orjson.dumps(cache_data))
+        logger.info("✅ Cached %s journey players to file", len(journey_players))
     except Exception as e:
-        print(f"Journey cache write error: {e}")
+        logger.warning("Journey cache write error: %s", e)
     
     # Save to Supabase for future fast fetches
     save_journey_players_to_supabase(journey_players)
@@ -0,0 +1,189 @@
+"""
+Player field normalization shared by the API service and the sync scripts.
+
+Pure lookups only (no NBA API session, Supabase client or logging setup), so
+scripts can import these without pulling in nba_service's import-time setup.
+"""
+
+from itertools import product
+from typing import List, Optional
+
+import numpy as np
+
+
+# Team ID to abbreviation mapping. Franchise IDs survive relocations, so
+# historical abbreviations only need nba_service.HISTORICAL_ABBR_TO_CURRENT
+TEAM_ID_TO_ABBR = {
+    1610612737: "ATL", 1610612738: "BOS", 1610612739: "CLE",
+    1610612740: "NOP", 1610612741: "CHI", 1610612742: "DAL",
+    1610612743: "DEN", 1610612744: "GSW", 1610612745: "HOU",
+    1610612746: "LAC", 1610612747: "LAL", 1610612748: "MIA",
+    1610612749: "MIL", 1610612750: "MIN", 1610612751: "BKN",
+    1610612752: "NYK", 1610612753: "ORL", 1610612754: "IND",
+    1610612755: "PHI", 1610612756: "PHX", 1610612757: "POR",
+    1610612758: "SAC", 1610612759: "SAS", 1610612760: "OKC",
+    1610612761: "TOR", 1610612762: "UTA", 1610612763: "MEM",
+    1610612764: "WAS", 1610612765: "DET", 1610612766: "CHA",
+}
+
+
+def _guard_position(stats: Optional[dict]) -> str:
+    """G: PG for playmakers, otherwise SG"""
+    if stats:
+        ast = stats.get("ast", 0) or 0
+        pts = stats.get("pts", 0) or 0
+        if ast > 4 or (ast > 2 and pts < 15):
+            return "PG"
+    return "SG"
+
+
+def _forward_position(stats: Optional[dict]) -> str:
+    """F: PF for rebounders/shot blockers, otherwise SF"""
+    if stats:
+        reb = stats.get("reb", 0) or 0
+        blk = stats.get("blk", 0) or 0
+        if reb > 6 or blk > 1:
+            return "PF"
+    return "SF"
+
+
+def _swing_position(stats: Optional[dict]) -> str:
+    """G-F / F-G: SG if more assists than rebounds, otherwise SF"""
+    if stats:
+        ast = stats.get("ast", 0) or 0
+        reb = stats.get("reb", 0) or 0
+        if ast > reb:
+            return "SG"
+    return "SF"
+
+
+# Position rule for every G/F/C value PlayerIndex reports (single and combo),
+# so normalize_position is one dict lookup instead of a string-parsing ladder
+_POSITION_RULES = {
+    "C": lambda stats: "C",
+    "G": _guard_position,
+    "F": _forward_position,
+    "G-F": _swing_position,
+    "F-G": _swing_position,
+    "F-C": lambda stats: "PF",
+    "C-F": lambda stats: "C",
+    "C-G": lambda stats: "C",
+    "G-C": lambda stats: "SG",
+}
+
+
+def normalize_position(pos: str, stats: dict = None) -> str:
+    """
+    Convert NBA API position format to standard 5-position format.
+    NBA API uses: G, F, C, G-F, F-G, C-F, F-C, etc.
+    We want: PG, SG, SF, PF, C
+    """
+    if not pos:
+        return infer_position_from_stats(stats) if stats else "SF"
+    
+    pos = pos.upper().strip()
+    rule = _POSITION_RULES.get(pos)
+    if rule:
+        return rule(stats)
+    
+    # Anything else: other combos use the first position as primary
+    if "-" in pos:
+        primary, secondary = pos.split("-")
+        
+        if primary == "C":
+            return "C"
+        if primary == "F" and secondary == "C":
+            return "PF"
+        if ("F" in pos and "G" in pos):
+            return _swing_position(stats)
+        if primary == "G":
+            return "SG"
+        if primary == "F":
+            return "SF"
+    
+    return infer_position_from_stats(stats) if stats else "SF"
+
+
+# Inferred position for each combination of (center, power forward, point
+# guard, shooting guard) stat profiles; the first matching profile wins,
+# otherwise small forward
+_INFERRED_POSITIONS = {
+    profile: next((pos for matched, pos in zip(profile, ("C", "PF", "PG", "SG")) if matched), "SF")
+    for profile in product((False, True), repeat=4)
+}
+
+
+def infer_position_from_stats(stats: dict) -> str:
+    """Fallback position inference from stats"""
+    if not stats:
+        return "SF"
+    
+    pts = stats.get("pts", 0) or 0
+    reb = stats.get("reb", 0) or 0
+    ast = stats.get("ast", 0) or 0
+    blk = stats.get("blk", 0) or 0
+    
+    return _INFERRED_POSITIONS[(
+        reb > 10 or (reb > 8 and blk > 1),
+        reb > 6,
+        ast > 5 or (ast > 3 and pts < 18),
+        pts > 15 and reb < 5 and ast < 5,
+    )]
+
+
+def normalize_positions(
+    raw_positions: List[str],
+    pts: np.ndarray,
+    reb: np.ndarray,
+    ast: np.ndarray,
+    blk: np.ndarray,
+) -> List[str]:
+    """
+    normalize_position over whole columns at once: raw_positions[i] with the
+    i-th entries of the stat arrays gives the same result as
+    normalize_position(raw_positions[i], stats).
+    """
+    if len(raw_positions) == 0:
+        # np.char.partition can't size its output for an empty array
+        return []
+    pos = np.char.strip(np.char.upper(np.array([p or "" for p in raw_positions], dtype=str)))
+    primary, _, secondary = (np.char.partition(pos, "-")[:, k] for k in range(3))
+    has_f = np.char.find(pos, "F") >= 0
+    has_g = np.char.find(pos, "G") >= 0
+
+    inferred = np.select(
+        [
+            ((reb > 8) & (blk > 1)) | (reb > 10),
+            reb > 6,
+            (ast > 5) | ((ast > 3) & (pts < 18)),
+            (pts > 15) & (reb < 5) & (ast < 5),
+        ],
+        ["C", "PF", "PG", "SG"],
+        "SF",
+    )
+    combo = np.select(
+        [
+            primary == "C",
+            (primary == "F") & (secondary == "C"),
+            has_f & has_g,
+            primary == "G",
+            primary == "F",
+        ],
+        ["C", "PF", np.where(ast > reb, "SG", "SF"), "SG", "SF"],
+        inferred,
+    )
+    return np.select(
+        [
+            pos == "C",
+            pos == "G",
+            pos == "F",
+            np.char.find(pos, "-") >= 0,
+        ],
+        [
+            "C",
+            np.where((ast > 4) | ((ast > 2) & (pts < 15)), "PG", "SG"),
+            np.where((reb > 6) | (blk > 1), "PF", "SF"),
+            combo,
+        ],
+        inferred,
+    ).tolist()
@@ -18,6 +18,14 @@ interface Shot {
   isThree: boolean
 }
 
+// Columnar shot payload from /api/stats/shot-chart: index i across lists is one shot
+interface ShotColumns {
+  x: number[]
+  y: number[]
+  made: boolean[]
+  is_three: boolean[]
+}
+
 interface ShotChartVisualizerProps {
   selectedPlayer?: Player | null
 }
@@ -46,11 +54,12 @@ export function ShotChartVisualizer({ selectedPlayer }: ShotChartVisualizerProps
         if (res.ok) {
           const data = await res.json()
           setUsingRealData(data.using_real_data)
-          const mappedShots: Shot[] = data.shots.map((s: { x: number; y: number; made: boolean; is_three: boolean }) => ({
-            x: s.x,
-            y: s.y,
-            made: s.made,
-            isThree: s.is_three,
+          const cols: ShotColumns = data.shots
+          const mappedShots: Shot[] = cols.x.map((x, i) => ({
+            x,
+            y: cols.y[i],
+            made: cols.made[i],
+            isThree: cols.is_three[i],
           }))
           setShots(mappedShots)
         }
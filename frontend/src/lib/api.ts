@@ -161,7 +161,11 @@ class ApiClient {
   }
 
   async getShotChart(playerId: number) {
-    return this.request<{ player_id: number; shots: any[]; stats: any }>(`/api/stats/shot-chart/${playerId}`)
+    return this.request<{
+      player_id: number
+      shots: { x: number[]; y: number[]; made: boolean[]; is_three: boolean[] }
+      stats: any
+    }>(`/api/stats/shot-chart/${playerId}`)
   }
 
   async getStatLeaders(stat: string = 'pts', limit: number = 10) {